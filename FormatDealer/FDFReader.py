@@ -1,12 +1,12 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "excelArrange"))
+from fdfSchema import compile_fdf
+
+
 def parse_lengths(file_path):
-    lengths = []
-    with open(file_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith("Length="):
-                value = int(line.split("=")[1])
-                lengths.append(value)
-    return lengths
+    return compile_fdf(file_path).lengths
 
 
 if __name__ == "__main__":
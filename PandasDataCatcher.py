@@ -1,6 +1,20 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-import pandas as pd
+from tkinter import filedialog, messagebox
+import os
+import sys
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "excelArrange"))
+from deltaExport import export_delta
+from jobRunner import JobRunner, confirm_full_load
+from memoryBudget import check_budget, format_bytes
+from parallelExport import export_text_parallel
+from runTimer import start_timer
+from sheetCache import shared_cache
+from sheetStream import stream_concat
+from textExport import export_text
+from virtualTree import VirtualTreeview
+from workbookScanner import scan_headers
 
 
 class ExcelViewer:
@@ -10,9 +24,14 @@ class ExcelViewer:
         self.root.geometry("1200x700")
 
         self.file_path = None
-        self.excel_file = None
+        self.sheet_headers = {}
         self.sheet_vars = {}
         self.column_vars = {}
+        self.parallel_var = tk.BooleanVar(value=False)
+        self.delta_var = tk.BooleanVar(value=False)
+        self.as_text_var = tk.BooleanVar(value=False)
+        self.key_var = tk.StringVar()
+        self.stream_var = tk.BooleanVar(value=False)
 
         # === 按鈕區 ===
         btn_frame = tk.Frame(root)
@@ -32,21 +51,60 @@ class ExcelViewer:
         self.lbl_filename = tk.Label(file_frame, text="（未選擇檔案）", anchor="w")
         self.lbl_filename.pack(side="left", padx=10)
 
+        # 串流模式：邊讀邊寫，記憶體不隨工作表大小成長
+        tk.Checkbutton(
+            btn_frame, text="串流模式（大檔）", variable=self.stream_var
+        ).pack(side="left", padx=10)
+
+        # 以文字讀取：儲存格不推斷型別，00123 這類代碼原樣輸出 (數字 1057.0 也輸出為 1057)
+        tk.Checkbutton(
+            btn_frame, text="以文字讀取", variable=self.as_text_var
+        ).pack(side="left", padx=10)
+
+        # 平行處理：多張工作表同時讀取，大表切塊給多個 process 格式化
+        tk.Checkbutton(
+            btn_frame, text="平行處理（多核心）", variable=self.parallel_var
+        ).pack(side="left", padx=10)
+
+        # 差異輸出：只輸出與上次相比新增 / 修改的記錄 (依鍵欄位比對)
+        tk.Checkbutton(
+            btn_frame, text="差異輸出", variable=self.delta_var
+        ).pack(side="left", padx=(10, 0))
+        tk.Label(btn_frame, text="鍵欄位").pack(side="left")
+        tk.Entry(btn_frame, textvariable=self.key_var, width=12).pack(side="left", padx=5)
+
+        # 背景工作進度 / 取消
+        self.runner = JobRunner(root, btn_frame)
+        self.runner.frame.pack(side="right", padx=5)
+
         # === 工作表區 ===
         self.sheet_frame = tk.Frame(root)
         self.sheet_frame.pack(fill="x", pady=5)
 
         # === 預覽表格 ===
-        self.tree = ttk.Treeview(root)
+        self.tree = VirtualTreeview(root)
         self.tree.pack(fill="both", expand=True, padx=5, pady=5)
 
     def open_file(self):
-        self.file_path = filedialog.askopenfilename(
+        # 有工作執行中時不換檔 (背景工作仍在使用目前的檔案與勾選狀態)
+        if self.runner.busy:
+            messagebox.showwarning("提醒", "目前已有工作執行中")
+            return
+        file_path = filedialog.askopenfilename(
             filetypes=[("Excel files", "*.xls *.xlsx")]
         )
-        if not self.file_path:
+        if not file_path:
             return
 
+        # === 載入新檔案 (開始後才換檔、清空狀態) ===
+        if not self.runner.start(
+            lambda job: scan_headers(file_path),
+            on_done=self.build_sheet_list,
+            text="讀取工作表...",
+        ):
+            return
+        self.file_path = file_path
+
         # 顯示檔案名稱（只顯示檔名，不含路徑）
         filename = self.file_path.split("/")[-1]
         self.lbl_filename.config(text=filename)
@@ -56,13 +114,12 @@ class ExcelViewer:
         self.column_vars.clear()
         for widget in self.sheet_frame.winfo_children():
             widget.destroy()
-        self.tree.delete(*self.tree.get_children())   # 清空預覽表格
-        self.tree["columns"] = ()
-
-        # === 載入新檔案 ===
-        self.excel_file = pd.ExcelFile(self.file_path)
+        self.tree.clear()   # 清空預覽表格
 
-        for i, sheet_name in enumerate(self.excel_file.sheet_names):
+    def build_sheet_list(self, sheet_headers):
+        """依掃描到的工作表 / 欄位建立勾選區"""
+        self.sheet_headers = sheet_headers
+        for i, (sheet_name, columns) in enumerate(self.sheet_headers.items()):
             row_frame = tk.Frame(self.sheet_frame)
             row_frame.pack(fill="x", pady=2, anchor="w")
 
@@ -102,8 +159,7 @@ class ExcelViewer:
             col_frame.pack(side="left", padx=10)
             self.column_vars[sheet_name] = {"frame": col_frame, "vars": {}, "widgets": {}}
 
-            df = self.excel_file.parse(sheet_name, header=0, nrows=1)
-            for j, col in enumerate(df.columns):
+            for j, col in enumerate(columns):
                 var_col = tk.BooleanVar(value=False)
                 cb_col = tk.Checkbutton(
                     col_frame,
@@ -132,18 +188,9 @@ class ExcelViewer:
 
     def show_preview(self, sheet_name):
         """預覽整個工作表，不受欄位勾選影響"""
-        df = pd.read_excel(self.file_path, sheet_name=sheet_name, header=0)
+        df = shared_cache.get(self.file_path, sheet_name, self.as_text_var.get())
 
-        self.tree.delete(*self.tree.get_children())
-        self.tree["columns"] = list(df.columns)
-        self.tree["show"] = "headings"
-        for col in df.columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=120, anchor="center")
-
-        # 顯示前 20 列資料
-        for _, row in df.head(20).iterrows():
-            self.tree.insert("", "end", values=list(row))
+        self.tree.set_frame(df)
 
     def run(self):
         if not self.file_path:
@@ -155,36 +202,110 @@ class ExcelViewer:
             messagebox.showwarning("警告", "請至少勾選一個工作表")
             return
 
-        all_texts = []
-        for sheet_name in selected_sheets:
-            df = pd.read_excel(self.file_path, header=0, sheet_name=sheet_name)
+        selections = [
+            (s, [i for i, var in self.column_vars[s]["vars"].items() if var.get()])
+            for s in selected_sheets
+        ]
+        if not any(cols for _, cols in selections):
+            messagebox.showwarning("警告", "沒有可輸出的資料")
+            return
+
+        save_path = filedialog.asksaveasfilename(
+            defaultextension=".txt", filetypes=[("Text files", "*.txt")]
+        )
+        if not save_path:
+            return
+
+        timer = start_timer("PandasDataCatcher")
+        as_text = self.as_text_var.get()
+        key_names = None
+        if self.delta_var.get():
+            key_names = [k.strip() for k in self.key_var.get().split(",") if k.strip()]
+            if not key_names:
+                messagebox.showwarning("警告", "差異輸出需要鍵欄位 (多個以逗號分隔)")
+                return
+        elif self.stream_var.get():
+            # 串流模式：邊讀邊寫，記憶體不隨工作表大小成長 (不需預估)
+            self.start_export(selections, save_path, timer, as_text, stream=True)
+            return
 
-            selected_indexes = [
-                i for i, var in self.column_vars[sheet_name]["vars"].items() if var.get()
-            ]
-            if not selected_indexes:
-                continue
+        # 讀檔前依工作表大小預估記憶體；在背景執行 (.xls 要開啟整個活頁簿才知道大小)
+        self.runner.start(
+            lambda job: check_budget(self.file_path, selections),
+            on_done=lambda budget: self.start_export(selections, save_path, timer, as_text, key_names, budget),
+            text="預估記憶體...",
+        )
 
-            df_filtered = df.iloc[:, selected_indexes].dropna()
-            concat_series = df_filtered.fillna("").astype(str).agg("".join, axis=1)
-            all_texts.extend(concat_series.tolist())
+    def start_export(self, selections, save_path, timer, as_text, key_names=None, budget=(0, False), stream=False):
+        """依記憶體預估選擇輸出方式並開始背景工作
+
+        超過上限 (MEMORY_BUDGET_MB) 時改用串流模式；串流輸出與「以文字讀取」相同 (72.0 寫成 72)，
+        所以差異輸出或未勾選「以文字讀取」時不切換，改為先詢問是否仍要整張讀入。
+        """
+        estimate, over_budget = budget
+        note = None
+        if over_budget:
+            if key_names is None and as_text:
+                stream = True
+                note = f"預估需要 {format_bytes(estimate)}，超過記憶體上限，改用串流模式"
+            elif not confirm_full_load(
+                estimate, "差異輸出需整張讀入" if key_names else "未勾選「以文字讀取」無法改用串流模式"
+            ):
+                return
+
+        if key_names is not None:
+            def work(job):
+                return export_delta(
+                    self.file_path, selections, save_path, key_names, None,
+                    progress=job.progress, timer=timer, read_as_text=as_text
+                )
 
-        if not all_texts:
-            messagebox.showwarning("警告", "沒有可輸出的資料")
+            self.runner.start(work, on_done=lambda result: self.on_delta_exported(save_path, result, timer))
             return
 
-        save_path = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt")]
+        if stream:
+            def work(job):
+                if note:
+                    job.progress(0, None, note)
+                return stream_concat(self.file_path, selections, save_path, progress=job.progress, timer=timer)
+        elif self.parallel_var.get():
+            # 平行模式：結果與逐張處理完全相同
+            def work(job):
+                return export_text_parallel(
+                    self.file_path, selections, save_path, progress=job.progress, timer=timer, as_text=as_text
+                )
+        else:
+            def work(job):
+                return export_text(
+                    self.file_path, selections, save_path, progress=job.progress, timer=timer, as_text=as_text
+                )
+
+        self.runner.start(work, on_done=lambda count: self.on_exported(save_path, count, timer))
+
+    def show_timing(self, timer, save_path, rows, **extra):
+        """有開啟 RUN_REPORT 時寫出執行報告，並在狀態列顯示各階段時間"""
+        summary = timer.finish(save_path, rows, peak_rss=self.runner.peak_rss, **extra)
+        if summary:
+            self.runner.set_status(summary)
+
+    def on_exported(self, save_path, count, timer):
+        if count == 0:
+            messagebox.showwarning("警告", "沒有可輸出的資料")
+            return
+        self.show_timing(timer, save_path, count)
+        messagebox.showinfo("完成", f"已輸出 {count} 筆到 {save_path}")
+
+    def on_delta_exported(self, save_path, result, timer):
+        self.show_timing(timer, save_path, result.written, **result._asdict())
+        messagebox.showinfo(
+            "完成",
+            f"差異輸出 {result.written} 筆到 {save_path}\n"
+            f"新增 {result.inserted} / 修改 {result.changed} / 刪除 {result.deleted} / 未變動 {result.unchanged}"
         )
-        if save_path:
-            with open(save_path, "w", encoding="utf-8") as f:
-                for line in all_texts:
-                    f.write(line + "\n")
-            messagebox.showinfo("完成", f"已輸出到 {save_path}")
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ExcelViewer(root)
     root.mainloop()
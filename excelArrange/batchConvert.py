@@ -0,0 +1,147 @@
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from fdfEncoder import write_lines
+from fdfSchema import compile_fdf
+from readerBackend import open_book
+from recordBuffer import DEFAULT_ENCODING, write_records
+from sidecarCache import read_cached
+from textExport import format_frame, prepare_frame
+
+
+# ===== 批次轉檔 (不開 GUI，多個 Excel 以 process pool 平行處理) =====
+def _pick(items, wanted, what):
+    """依名稱或 index 挑選，回傳 index 清單；wanted 為空代表全選"""
+    if not wanted:
+        return list(range(len(items)))
+    names = [str(x) for x in items]
+    picked = []
+    for w in wanted:
+        if w in names:
+            picked.append(names.index(w))
+        elif w.isdigit() and int(w) < len(items):
+            picked.append(int(w))
+        else:
+            raise ValueError(f"找不到{what}：{w}")
+    return picked
+
+
+def convert_workbook(file_path, out_path, sheets=None, columns=None, fdf_layout=None,
+                     encoding=DEFAULT_ENCODING, as_text=False):
+    """單一 Excel 轉文字檔，回傳 (輸出筆數, 耗時秒數)"""
+    t0 = time.perf_counter()
+    excel_file = open_book(file_path)
+    try:
+        frames = []
+        for s in _pick(excel_file.sheet_names, sheets, "工作表"):
+            name = excel_file.sheet_names[s]
+            df = read_cached(file_path, name, as_text, book=lambda: excel_file)
+            col_indexes = _pick(df.columns, columns, "欄位")
+            if col_indexes:
+                frames.append(prepare_frame(df, col_indexes, fdf_layout))
+    finally:
+        excel_file.close()
+    if fdf_layout:
+        count = write_records(out_path, frames, fdf_layout, encoding)
+        if count == 0:
+            open(out_path, "wb").close()
+    else:
+        write_lines(out_path, [format_frame(df) for df in frames])
+        count = sum(len(df) for df in frames)
+    return count, time.perf_counter() - t0
+
+
+def expand_inputs(patterns):
+    files = []
+    for p in patterns:
+        matched = sorted(glob.glob(p)) or [p]
+        files.extend(f for f in matched if f not in files)
+    return files
+
+
+def output_paths(files, out_dir):
+    """每個 Excel 對應 out_dir 下的 txt；不同目錄的同名檔依序改成 x_1.txt、x_2.txt，不互相覆蓋
+
+    (比對不分大小寫，Windows 上 X.txt 與 x.txt 是同一個檔)
+    """
+    stems = [os.path.splitext(os.path.basename(f))[0] for f in files]
+    taken = {s.lower() for s in stems}
+    used, paths = set(), {}
+    for f, stem in zip(files, stems):
+        name, n = stem, 0
+        while name.lower() in used or (n and name.lower() in taken):
+            n += 1
+            name = f"{stem}_{n}"
+        used.add(name.lower())
+        paths[f] = os.path.join(out_dir, name + ".txt")
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Excel 批次轉文字檔 (data2txt / data2txtWithFDF)")
+    parser.add_argument("inputs", nargs="+", help="Excel 檔案 (可用萬用字元)")
+    parser.add_argument("--sheets", nargs="*", default=[], help="工作表名稱或 index，預設全部")
+    parser.add_argument("--columns", nargs="*", default=[], help="欄位名稱或 index，預設全部")
+    parser.add_argument("--fdf", help="FDF 檔；指定時依 FDF 輸出定長格式")
+    parser.add_argument("--encoding", default=DEFAULT_ENCODING, help="FDF 輸出的編碼 (code page)")
+    parser.add_argument("--as-text", action="store_true", help="以文字讀取 (保留 00123 這類代碼，不轉成數字)")
+    parser.add_argument("--out-dir", default=".", help="每個 Excel 各輸出一個 txt 的目錄")
+    parser.add_argument("--merge", help="合併輸出到單一 txt (依輸入順序)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="平行處理數")
+    args = parser.parse_args(argv)
+
+    files = expand_inputs(args.inputs)
+    fdf_layout = compile_fdf(args.fdf) if args.fdf else None
+
+    tmp_dir = tempfile.mkdtemp() if args.merge else None
+    if not args.merge:
+        os.makedirs(args.out_dir, exist_ok=True)
+    if args.merge:
+        targets = {f: os.path.join(tmp_dir, f"{i}.txt") for i, f in enumerate(files)}
+    else:
+        targets = output_paths(files, args.out_dir)
+        for f in files:
+            if os.path.splitext(os.path.basename(targets[f]))[0] != os.path.splitext(os.path.basename(f))[0]:
+                print(f"[NOTE] {f} 與其他檔案同名，輸出為 {targets[f]}")
+
+    failed = 0
+    total_t0 = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {
+                pool.submit(
+                    convert_workbook, f, targets[f], args.sheets, args.columns, fdf_layout, args.encoding,
+                    args.as_text
+                ): f
+                for f in files
+            }
+            for fut in as_completed(futures):
+                f = futures[fut]
+                try:
+                    rows, elapsed = fut.result()
+                    print(f"[OK]   {f}: {rows} 筆, {elapsed:.2f}s")
+                except Exception as e:
+                    failed += 1
+                    print(f"[FAIL] {f}: {e}", file=sys.stderr)
+
+        if args.merge and not failed:
+            with open(args.merge, "wb") as out:
+                for f in files:
+                    with open(targets[f], "rb") as part:
+                        shutil.copyfileobj(part, out)
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"完成 {len(files) - failed}/{len(files)} 個檔案, 共 {time.perf_counter() - total_t0:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# 效能測試：產生合成測試資料 (dataGen)，以不開視窗的方式計時各工具的核心函式 (benchRunner)
+# 在 excelArrange 目錄下執行：python -m benchmark --help
@@ -0,0 +1,5 @@
+import sys
+
+from benchmark.benchRunner import main
+
+sys.exit(main())
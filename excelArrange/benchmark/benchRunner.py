@@ -0,0 +1,280 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib.metadata import PackageNotFoundError, version
+
+from benchmark.dataGen import (FDF_FIELDS, FORMATS, NAME_COLUMN, SCALES, SHAPES, ensure_fdf, ensure_mapping,
+                               ensure_workbook, missing_writer, parse_scale, scale_label)
+from excelPrintPacker import reshape_df, write_packed
+from fdfSchema import compile_fdf
+import readerBackend
+from readerBackend import read_sheet
+from sheetCache import shared_cache
+from sidecarCache import ENABLED as SIDECAR_AVAILABLE, sidecar_cache
+from tcodeIndex import load_index
+from textExport import export_text
+import tcodeTransfer
+
+RESULT_VERSION = 1
+DEFAULT_DATA_DIR = "./bench_data"
+DEFAULT_THRESHOLD = 0.10  # 比較時慢超過 10% 視為退步
+PACKAGES = ("pandas", "numpy", "openpyxl", "python-calamine", "pyarrow", "xlsxwriter", "xlrd", "xlwt")
+
+
+# ===== 各工具的核心函式 (不開視窗，參數同 GUI 預設) =====
+# 每個函式回傳 (讀入筆數, 輸出筆數, 輸出檔)
+def run_data2txt(ctx):
+    """data2txt：所有工作表全部欄位串接"""
+    book = ctx["book"]
+    selections = [(s, list(range(book.cols))) for s in book.sheets]
+    rows = export_text(book.path, selections, ctx["output"] + ".txt", as_text=ctx["as_text"])
+    return book.rows, rows, ctx["output"] + ".txt"
+
+
+def run_data2txt_fdf(ctx):
+    """data2txtWithFDF：所有工作表的 USERMSP 10 欄依 FDF 輸出定長記錄"""
+    book = ctx["book"]
+    selections = [(s, list(range(len(FDF_FIELDS)))) for s in book.sheets]
+    rows = export_text(book.path, selections, ctx["output"] + ".txt", fdf_layout=compile_fdf(ctx["fdf"]),
+                       as_text=ctx["as_text"])
+    return book.rows, rows, ctx["output"] + ".txt"
+
+
+def run_tcode(ctx):
+    """tcodeTransfer：第一張工作表以客戶名稱對應 TCODE (含模糊比對)"""
+    tcodeTransfer.fuzzy_index = None  # n-gram 索引的建立也算在內
+    df = tcodeTransfer.read_sheet(ctx["book"].path, ctx["book"].sheets[0], ctx["as_text"])
+    missing, _ = tcodeTransfer.transfer(df, NAME_COLUMN, load_index(ctx["mapping"]), ctx["output"] + ".xlsx")
+    return len(df), len(df) - missing, ctx["output"] + ".xlsx"
+
+
+def run_packer(ctx):
+    """excelPrintPacker：第一張工作表 2-up、每頁 50 行"""
+    df = read_sheet(ctx["book"].path, ctx["book"].sheets[0])
+    packed, header_rows = reshape_df(df, 2, 50)
+    write_packed(ctx["output"] + ".xlsx", packed, header_rows)
+    return len(df), len(packed), ctx["output"] + ".xlsx"
+
+
+TOOLS = {
+    "data2txt": run_data2txt,
+    "data2txtWithFDF": run_data2txt_fdf,
+    "tcodeTransfer": run_tcode,
+    "excelPrintPacker": run_packer,
+}
+
+
+# ===== 執行環境 =====
+def git_commit():
+    """目前的 commit (工作目錄有未提交修改時加上 -dirty)；不是 git 目錄時回傳 None"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=here, capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=here, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return head.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+
+def environment():
+    versions = {}
+    for name in PACKAGES:
+        try:
+            versions[name] = version(name)
+        except PackageNotFoundError:
+            versions[name] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+# ===== 計時 =====
+def case_key(case):
+    return f"{case['tool']}/{case['format']}/{case['shape']}/{case['scale']}"
+
+
+def time_case(tool, ctx, repeat):
+    """執行 repeat 次，每次先清掉工作表快取 (讀檔時間要算在內)
+
+    有開啟磁碟快取時只在第一次前清掉：第一次為解析 Excel 並存快取，之後為載入快取。
+    """
+    times = []
+    sidecar_cache.clear()
+    for _ in range(repeat):
+        shared_cache.clear()
+        t0 = time.perf_counter()
+        rows, rows_out, output = TOOLS[tool](ctx)
+        times.append(time.perf_counter() - t0)
+    shared_cache.clear()
+    best = min(times)
+    return {
+        "status": "ok",
+        "rows": rows,
+        "rows_out": rows_out,
+        "times": [round(t, 4) for t in times],
+        "best": round(best, 4),
+        "mean": round(sum(times) / len(times), 4),
+        "first": round(times[0], 4),
+        "rows_per_s": round(rows / best) if best else None,
+        "output_bytes": os.path.getsize(output) if os.path.exists(output) else 0,
+    }
+
+
+def run_suite(scales, shapes, formats, tools, repeat=3, seed=0, data_dir=DEFAULT_DATA_DIR, log=print,
+              as_text=False, engine=None, sidecar=False):
+    """產生 (或沿用) 測試資料並逐一計時，回傳結果 dict (可直接寫成 JSON)
+
+    as_text=True 時 data2txt / data2txtWithFDF / tcodeTransfer 以文字讀取 (textReader)，
+    與預設讀取各跑一次後可用 --compare 比較。engine 強制指定讀取引擎 (例如 openpyxl)，
+    未指定時同各工具，依 readerBackend 選已安裝中最快的。
+    sidecar=True 時開啟磁碟快取 (放在 <data_dir>/sidecar)，否則關閉，每次都解析 Excel。
+    """
+    if sidecar and not SIDECAR_AVAILABLE:
+        raise ValueError("磁碟快取需要安裝 pyarrow")
+    sidecar_cache.enabled = sidecar
+    sidecar_cache.directory = os.path.join(data_dir, "sidecar")
+    if engine:
+        readerBackend.forced_engine = engine
+    fdf_path = ensure_fdf(data_dir)
+    mapping_path = ensure_mapping(data_dir, seed)
+    out_dir = os.path.join(data_dir, "output")
+    os.makedirs(out_dir, exist_ok=True)
+
+    cases = []
+    for fmt in formats:
+        skip = missing_writer(fmt)
+        for shape in shapes:
+            for rows in scales:
+                book = None if skip else ensure_workbook(data_dir, rows, shape, fmt, seed, log)
+                for tool in tools:
+                    case = {"tool": tool, "format": fmt, "shape": shape, "scale": scale_label(rows)}
+                    if book is None:
+                        case.update(status="skipped", note=skip)
+                        log(f"{case_key(case)} 略過：{skip}")
+                        cases.append(case)
+                        continue
+                    case.update(input_rows=book.rows, cols=book.cols, sheets=len(book.sheets),
+                                generate_seconds=round(book.seconds, 3))
+                    ctx = {"book": book, "fdf": fdf_path, "mapping": mapping_path, "as_text": as_text,
+                           "output": os.path.join(out_dir, f"{tool}_{fmt}_{shape}_{scale_label(rows)}")}
+                    log(f"{case_key(case)} ...", end=" ", flush=True)
+                    try:
+                        case.update(time_case(tool, ctx, repeat))
+                        log(f"{case['best']:.3f}s ({case['rows_per_s']} 筆/s)")
+                    except Exception as e:  # 一個案例失敗不影響其他案例
+                        case.update(status="error", note=f"{type(e).__name__}: {e}")
+                        log(f"失敗：{case['note']}")
+                    cases.append(case)
+
+    return {
+        "version": RESULT_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "environment": environment(),
+        "settings": {"repeat": repeat, "seed": seed, "as_text": as_text, "sidecar": sidecar,
+                     "engines": {fmt: readerBackend.pick_engine("x." + fmt) for fmt in formats}},
+        "cases": cases,
+    }
+
+
+def save_results(result, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def default_result_path(data_dir, result):
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    commit = (result["commit"] or "nogit")[:7]
+    return os.path.join(data_dir, "results", f"{stamp}-{commit}.json")
+
+
+# ===== 比較兩次結果 =====
+def compare_results(old, new, threshold=DEFAULT_THRESHOLD):
+    """依 best 比較相同案例，回傳 [(案例, 舊秒數, 新秒數, 比值, 是否退步), ...]"""
+    before = {case_key(c): c for c in old["cases"] if c.get("status") == "ok"}
+    rows = []
+    for case in new["cases"]:
+        key = case_key(case)
+        if case.get("status") != "ok" or key not in before:
+            continue
+        a, b = before[key]["best"], case["best"]
+        ratio = b / a if a else float("inf")
+        rows.append((key, a, b, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def print_comparison(old, new, rows):
+    print(f"舊：{old.get('commit')} ({old.get('created')})")
+    print(f"新：{new.get('commit')} ({new.get('created')})")
+    width = max([len(r[0]) for r in rows] + [4])
+    print(f"{'案例':<{width}}  {'舊(s)':>9}  {'新(s)':>9}  {'比值':>6}")
+    for key, a, b, ratio, worse in rows:
+        print(f"{key:<{width}}  {a:>9.3f}  {b:>9.3f}  {ratio:>6.2f}{'  ← 退步' if worse else ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark",
+        description="以合成資料計時 data2txt / data2txtWithFDF / tcodeTransfer / excelPrintPacker，結果寫成 JSON")
+    parser.add_argument("--scales", nargs="+", default=["10k", "100k"],
+                        help=f"筆數，可用 {' / '.join(SCALES)} 或數字 (預設 10k 100k)")
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=SHAPES)
+    parser.add_argument("--formats", nargs="+", default=["xlsx"], choices=FORMATS)
+    parser.add_argument("--tools", nargs="+", default=list(TOOLS), choices=list(TOOLS))
+    parser.add_argument("--repeat", type=int, default=3, help="每個案例執行次數，取最快的一次 (預設 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="測試資料與輸出的目錄")
+    parser.add_argument("--out", help="結果 JSON (預設 <data-dir>/results/<時間>-<commit>.json)")
+    parser.add_argument("--as-text", action="store_true", help="以文字讀取 (textReader) 計時")
+    parser.add_argument("--engine", choices=list(readerBackend.ENGINE_MODULES),
+                        help="強制指定讀取引擎 (預設依 readerBackend 選最快的)")
+    parser.add_argument("--sidecar", action="store_true",
+                        help="開啟磁碟快取 (第一次解析並存快取，之後載入；見結果的 first / best)")
+    parser.add_argument("--generate-only", action="store_true", help="只產生測試資料，不計時")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="比較兩個結果 JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="比較時慢超過這個比例視為退步 (預設 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        results = []
+        for path in args.compare:
+            with open(path, "r", encoding="utf-8") as f:
+                results.append(json.load(f))
+        rows = compare_results(*results, threshold=args.threshold)
+        print_comparison(*results, rows)
+        return 1 if any(r[4] for r in rows) else 0
+
+    scales = [parse_scale(s) for s in args.scales]
+    if args.generate_only:
+        ensure_fdf(args.data_dir)
+        ensure_mapping(args.data_dir, args.seed)
+        for fmt in args.formats:
+            if missing_writer(fmt):
+                print(missing_writer(fmt))
+                continue
+            for shape in args.shapes:
+                for rows in scales:
+                    ensure_workbook(args.data_dir, rows, shape, fmt, args.seed)
+        return 0
+
+    result = run_suite(scales, args.shapes, args.formats, args.tools, args.repeat, args.seed, args.data_dir,
+                       as_text=args.as_text, engine=args.engine, sidecar=args.sidecar)
+    path = args.out or default_result_path(args.data_dir, result)
+    save_results(result, path)
+    print(f"結果已寫入 {path}")
+    return 0 if all(c["status"] != "error" for c in result["cases"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import math
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from fdfEncoderBench import make_frame
+from jobRunner import atomic_path
+from xlsxExport import MAX_ROWS, open_workbook, write_sheet
+
+# ===== 測試資料規模 / 形狀 =====
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+SHAPES = ("narrow", "wide", "sheets")
+FORMATS = ("xlsx", "xls")
+
+WIDE_FILLER = 190      # wide：USERMSP 10 欄 + 客戶名稱 + 190 欄填充資料
+MANY_SHEETS = 20       # sheets：同樣筆數平均分到 20 張工作表
+XLS_MAX_ROWS = 65536   # .xls 單張工作表上限 (含標題列)
+MAPPING_SIZE = 20_000  # 對照表筆數
+MISS_RATE = 0.05       # 客戶名稱中對照表找不到 (需模糊比對) 的比例
+NAME_COLUMN = "客戶名稱"
+
+# FDF 欄位 (同 FormatDealer/example.fdf，對應 make_frame 的前 10 欄)
+FDF_FIELDS = (
+    ("PSDLMK", 1, 1), ("PSKYCD", 5, 1), ("PSUSCD", 3, 1), ("PSMODL", 30, 1), ("PSAQTY", 7, 2),
+    ("PSAPRC", 9, 2), ("PSADDT", 7, 2), ("PSADUS", 10, 1), ("PSUPDT", 7, 2), ("PSUPUS", 10, 1),
+)
+
+
+class Workbook(NamedTuple):
+    path: str
+    format: str
+    shape: str
+    rows: int
+    cols: int
+    sheets: tuple   # 工作表名稱
+    seconds: float  # 產生花費的時間 (沿用既有檔案時為 0)
+
+
+def parse_scale(text):
+    """10k / 1m / 250000 -> 筆數"""
+    text = str(text).strip().lower()
+    if text in SCALES:
+        return SCALES[text]
+    for suffix, unit in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * unit)
+    return int(text)
+
+
+def scale_label(rows):
+    for label, n in SCALES.items():
+        if n == rows:
+            return label
+    return str(rows)
+
+
+# ===== 對照表 / 資料列 =====
+def make_mapping(size=MAPPING_SIZE, seed=0):
+    """產生 {TNAME: TCODE}，名稱近似公司行號 (有共同字首字尾，模糊比對才有意義)"""
+    rng = np.random.default_rng(seed)
+    cities = np.array(["台北", "新北", "桃園", "新竹", "台中", "台南", "高雄", "基隆"], dtype=object)
+    suffixes = np.array(["股份有限公司", "有限公司", "企業社", "商行", "工業"], dtype=object)
+    names = cities[rng.integers(0, len(cities), size)] + "客戶" + \
+        pd.Series(np.arange(size)).map("{:05d}".format).to_numpy(dtype=object) + \
+        suffixes[rng.integers(0, len(suffixes), size)]
+    codes = pd.Series(np.arange(size)).map("T{:06d}".format)
+    return dict(zip(names.tolist(), codes.tolist()))
+
+
+def _names_column(rows, names, rng):
+    """大部分取自對照表，MISS_RATE 的比例改寫成找不到的名稱 (去掉字尾再加「分公司」)"""
+    picked = names[rng.integers(0, len(names), rows)]
+    miss = rng.random(rows) < MISS_RATE
+    picked[miss] = pd.Series(picked[miss]).str.replace(r"(股份有限公司|有限公司|企業社|商行|工業)$", "分公司",
+                                                        regex=True).to_numpy(dtype=object)
+    return picked
+
+
+def make_sheet(rows, shape, names, seed):
+    """一張工作表的資料：make_frame (USERMSP 10 欄) + 客戶名稱 (+ wide 的填充欄)"""
+    rng = np.random.default_rng(seed + 1_000_003)
+    df = make_frame(rows, seed)
+    df[NAME_COLUMN] = _names_column(rows, names, rng)
+    if shape == "wide":
+        codes = np.array([f"C{i:02d}" for i in range(50)], dtype=object)
+        filler = {}
+        for i in range(WIDE_FILLER):
+            name = f"F{i + 1:03d}"
+            if i % 3 == 0:
+                filler[name] = rng.integers(0, 10**6, rows)
+            elif i % 3 == 1:
+                filler[name] = np.round(rng.random(rows) * 1000, 3)
+            else:
+                filler[name] = codes[rng.integers(0, len(codes), rows)]
+        df = pd.concat([df, pd.DataFrame(filler)], axis=1)
+    return df
+
+
+def sheet_sizes(rows, shape, fmt):
+    """各工作表筆數：sheets 形狀平均分成 MANY_SHEETS 張，其他依格式的列數上限切開"""
+    limit = (XLS_MAX_ROWS if fmt == "xls" else MAX_ROWS) - 1
+    count = MANY_SHEETS if shape == "sheets" else 1
+    count = max(count, math.ceil(rows / limit))
+    base, extra = divmod(rows, count)
+    return [base + (i < extra) for i in range(count)]
+
+
+# ===== 寫出 =====
+def _write_xlsx(path, frames):
+    with open_workbook(path) as workbook:
+        for sheet_name, df in frames:
+            write_sheet(workbook, sheet_name, df)
+
+
+def _write_xls(path, frames):
+    import xlwt  # 只有產生 .xls 時需要
+
+    book = xlwt.Workbook()
+    for sheet_name, df in frames:
+        ws = book.add_sheet(sheet_name)
+        for c, name in enumerate(df.columns):
+            ws.write(0, c, str(name))
+        for c in range(df.shape[1]):
+            for r, v in enumerate(df.iloc[:, c].tolist(), 1):
+                if v is not None and v != "":
+                    ws.write(r, c, v.item() if isinstance(v, np.generic) else v)
+    book.save(path)
+
+
+def missing_writer(fmt):
+    """該格式缺少的套件 (無法產生 / 讀取時回傳說明，否則 None)"""
+    if fmt != "xls":
+        return None
+    for module in ("xlwt", "xlrd"):
+        try:
+            __import__(module)
+        except ImportError:
+            return f"未安裝 {module}，略過 .xls"
+    return None
+
+
+def workbook_path(data_dir, rows, shape, fmt, seed):
+    return os.path.join(data_dir, f"bench_{shape}_{scale_label(rows)}_s{seed}.{fmt}")
+
+
+def ensure_workbook(data_dir, rows, shape, fmt="xlsx", seed=0, log=print):
+    """產生 (或沿用已產生的) 測試活頁簿；同樣參數產生的內容固定"""
+    sizes = sheet_sizes(rows, shape, fmt)
+    sheets = tuple(f"Sheet{i + 1}" for i in range(len(sizes)))
+    cols = len(FDF_FIELDS) + 1 + (WIDE_FILLER if shape == "wide" else 0)
+    path = workbook_path(data_dir, rows, shape, fmt, seed)
+    if os.path.exists(path):
+        return Workbook(path, fmt, shape, rows, cols, sheets, 0.0)
+
+    os.makedirs(data_dir, exist_ok=True)
+    log(f"產生 {os.path.basename(path)} ({rows} 筆, {len(sheets)} 張工作表)...")
+    names = np.array(list(make_mapping(seed=seed)), dtype=object)
+    # 逐張產生、寫完即丟，記憶體只需一張工作表的量
+    frames = ((name, make_sheet(n, shape, names, seed * 1000 + i)) for i, (name, n) in enumerate(zip(sheets, sizes)))
+    t0 = time.perf_counter()
+    with atomic_path(path) as tmp_path:
+        (_write_xls if fmt == "xls" else _write_xlsx)(tmp_path, frames)
+    return Workbook(path, fmt, shape, rows, cols, sheets, time.perf_counter() - t0)
+
+
+def ensure_fdf(data_dir):
+    """寫出對應 make_frame 前 10 欄的 FDF 檔 (格式同 example.fdf)"""
+    path = os.path.join(data_dir, "bench.fdf")
+    if os.path.exists(path):
+        return path
+    lines = ["[Data Transfer File Description]", f"FieldCount={len(FDF_FIELDS)}", "FileType=1", "Version=2",
+             "[Options]", "DateFormat=1", "DateSep=1", "DcmlSep=1", "TimeFormat=1", "TimeSep=1"]
+    for i, (name, length, ftype) in enumerate(FDF_FIELDS, 1):
+        lines += [f"[F{i:04d}]", f"Length={length}", f"Name={name}", f"Type={ftype}"]
+    os.makedirs(data_dir, exist_ok=True)
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    return path
+
+
+def ensure_mapping(data_dir, seed=0):
+    """寫出 DBeaver 匯出格式的對照表 (同 data/tantof.txt：| 分隔、第二列為 ----- 分隔線)"""
+    path = os.path.join(data_dir, f"tantof_s{seed}.txt")
+    if os.path.exists(path):
+        return path
+    mapping = make_mapping(seed=seed)
+    width = max(len(n) for n in mapping)
+    lines = [f"{'TNAME':<{width}}|TCODE  ", f"{'-' * width}|-------"]
+    lines += [f"{name:<{width}}|{code}" for name, code in mapping.items()]
+    os.makedirs(data_dir, exist_ok=True)
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    return path
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from benchmark.dataGen import SCALES, SHAPES, ensure_workbook, parse_scale, scale_label
+from benchmark.benchRunner import DEFAULT_DATA_DIR
+from memoryBudget import RssMonitor, format_bytes
+from readerBackend import engine_installed
+from textReader import read_sheet_text
+
+# ===== 讀取方式比較：各引擎的 read_excel / read_excel(dtype=str) / textReader =====
+# 每個方式在獨立的子 process 執行，峰值記憶體才不會互相影響；第一個為比較基準
+READERS = {
+    "openpyxl": lambda path, sheet: pd.read_excel(path, sheet_name=sheet, engine="openpyxl"),
+    "openpyxl_str": lambda path, sheet: pd.read_excel(
+        path, sheet_name=sheet, engine="openpyxl", dtype=str).astype(object),
+    "calamine": lambda path, sheet: pd.read_excel(path, sheet_name=sheet, engine="calamine"),
+    "calamine_str": lambda path, sheet: pd.read_excel(
+        path, sheet_name=sheet, engine="calamine", dtype=str).astype(object),
+    "read_sheet_text": read_sheet_text,  # 各工具實際使用的文字讀取 (有 calamine 時即 calamine_str)
+}
+
+
+def _as_text(df):
+    """與 read_excel 後 str() 相同的文字 (比較內容用)；空值為 None"""
+    return [[None if pd.isna(v) else str(v) for v in col] for _, col in df.items()]
+
+
+def measure(reader, path, sheet):
+    """在目前的 process 讀一次，回傳時間 / 峰值記憶體增量 / DataFrame 大小"""
+    with RssMonitor() as monitor:
+        t0 = time.perf_counter()
+        df = READERS[reader](path, sheet)
+        seconds = time.perf_counter() - t0
+    return {
+        "reader": reader,
+        "seconds": round(seconds, 4),
+        "peak_bytes": monitor.peak - monitor.start_rss,
+        "frame_bytes": int(df.memory_usage(index=True, deep=True).sum()),
+        "rows": len(df),
+        "cols": len(df.columns),
+    }
+
+
+def measure_in_subprocess(reader, path, sheet):
+    cmd = [sys.executable, "-m", "benchmark.readBench", "--measure", reader, path, sheet]
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(cmd, cwd=here, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def changed_cells(path, sheet):
+    """openpyxl dtype=str 與 textReader (目前引擎) 內容不同的儲存格數 (應為 0)"""
+    a = _as_text(READERS["openpyxl_str"](path, sheet))
+    b = _as_text(read_sheet_text(path, sheet))
+    if len(a) != len(b):
+        return None
+    return sum(x != y for col_a, col_b in zip(a, b) for x, y in zip(col_a, col_b))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark.readBench",
+        description="比較各讀取引擎 / 文字讀取讀入第一張工作表的時間與記憶體 (第一個為比較基準)")
+    parser.add_argument("--scales", nargs="+", default=["10k", "100k"],
+                        help=f"筆數，可用 {' / '.join(SCALES)} 或數字 (預設 10k 100k)")
+    parser.add_argument("--shapes", nargs="+", default=["narrow", "wide"], choices=SHAPES)
+    parser.add_argument("--readers", nargs="+", default=list(READERS), choices=list(READERS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="測試資料目錄")
+    parser.add_argument("--check", action="store_true", help="另外比對 openpyxl dtype=str 與 textReader 的內容")
+    parser.add_argument("--out", help="結果寫成 JSON")
+    parser.add_argument("--measure", nargs=3, metavar=("READER", "PATH", "SHEET"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        return 0
+
+    results = []
+    for shape in args.shapes:
+        for rows in (parse_scale(s) for s in args.scales):
+            book = ensure_workbook(args.data_dir, rows, shape, "xlsx", args.seed)
+            label = f"{shape}/{scale_label(rows)}"
+            base = None
+            for reader in args.readers:
+                if reader.startswith("calamine") and not engine_installed("calamine"):
+                    print(f"{label:<14} {reader:<16} 略過：未安裝 python-calamine")
+                    continue
+                r = measure_in_subprocess(reader, book.path, book.sheets[0])
+                r["case"] = label
+                base = base or r["seconds"]
+                print(f"{label:<14} {reader:<16} {r['seconds']:>8.2f}s  x{base / r['seconds']:>4.2f}  "
+                      f"峰值 +{format_bytes(r['peak_bytes']):>9}  DataFrame {format_bytes(r['frame_bytes']):>9}")
+                results.append(r)
+            if args.check:
+                print(f"{label:<14} openpyxl dtype=str 與 textReader 不同的儲存格：{changed_cells(book.path, book.sheets[0])}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import os
+import pickle
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from fdfEncoder import as_text, write_lines
+from jobRunner import atomic_path
+from recordBuffer import DEFAULT_ENCODING, encode_records, write_encoded
+from runTimer import NULL_TIMER
+from sheetCache import shared_cache
+from textExport import format_frame, prepare_frame
+
+MANIFEST_SUFFIX = ".manifest"
+MANIFEST_VERSION = 1
+
+
+class DeltaResult(NamedTuple):
+    inserted: int
+    changed: int
+    deleted: int
+    unchanged: int
+
+    @property
+    def written(self):
+        return self.inserted + self.changed
+
+
+# ===== 雜湊 (整欄向量化，跨次執行結果固定) =====
+def hash_values(series):
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+def key_text(df, key_names):
+    """鍵欄位轉成一個字串 (多欄以 tab 分隔)"""
+    missing = [k for k in key_names if k not in [str(c) for c in df.columns]]
+    if missing:
+        raise ValueError(f"勾選的欄位中找不到鍵欄位：{', '.join(missing)}")
+    names = [str(c) for c in df.columns]
+    parts = [as_text(df.iloc[:, names.index(k)]).reset_index(drop=True) for k in key_names]
+    if len(parts) == 1:
+        return parts[0]
+    return parts[0].str.cat(parts[1:], sep="\t")
+
+
+def record_hashes(records):
+    """輸出內容本身的雜湊：文字列 Series 或 FDF 編碼後的 (n, 記錄長度) 位元組陣列"""
+    if isinstance(records, np.ndarray):
+        return hash_values(pd.Series(np.ascontiguousarray(records).view(f"S{records.shape[1]}").ravel()))
+    return hash_values(records.reset_index(drop=True))
+
+
+def _signature(fdf_layout, encoding):
+    """輸出格式不同時舊的內容雜湊無法比較"""
+    if fdf_layout:
+        return ("fdf", tuple(fdf_layout.fields), encoding)
+    return ("concat",)
+
+
+# ===== manifest (與輸出檔同目錄：<輸出檔>.manifest) =====
+def manifest_path(save_path):
+    return save_path + MANIFEST_SUFFIX
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        manifest = pickle.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"無法辨識的 manifest 版本：{path}")
+    return manifest
+
+
+def save_manifest(path, keys, hashes, texts, signature):
+    # 同一個鍵出現多次時以最後一筆為準
+    last = ~pd.Index(keys).duplicated(keep="last")
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "signature": signature,
+        "keys": keys[last],
+        "hashes": hashes[last],
+        "key_text": texts[last],
+    }
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(manifest, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def compare(prev, keys, hashes, signature):
+    """回傳 (新增遮罩, 修改遮罩, 刪除遮罩 (對 prev))"""
+    if prev is None:
+        return np.ones(len(keys), dtype=bool), np.zeros(len(keys), dtype=bool), np.zeros(0, dtype=bool)
+    pos = pd.Index(prev["keys"]).get_indexer(keys)
+    inserted = pos < 0
+    if not len(prev["keys"]):
+        changed = np.zeros(len(keys), dtype=bool)  # 上次 0 筆：全部為新增
+    elif prev["signature"] == signature:
+        changed = ~inserted & (prev["hashes"][np.where(inserted, 0, pos)] != hashes)
+    else:
+        changed = ~inserted  # 格式改了，舊資料全部視為修改
+    deleted = ~np.isin(prev["keys"], keys)
+    return inserted, changed, deleted
+
+
+# ===== 差異輸出 =====
+def export_delta(file_path, selections, save_path, key_names, fdf_layout=None, deletions=True,
+                 encoding=DEFAULT_ENCODING, progress=None, timer=NULL_TIMER, read_as_text=False):
+    """只輸出與上次相比新增或修改的記錄，並更新 manifest
+
+    selections: [(sheet_name, [欄位 index, ...]), ...]
+    key_names: 鍵欄位名稱 (須在勾選的欄位中)。
+    read_as_text：以文字讀取工作表 (同 sheetCache 的 as_text；改名以免遮蔽 fdfEncoder.as_text)。
+    deletions=True 時另寫 <檔名>.deleted<副檔名>，每行一個被刪除記錄的鍵 (多欄以 tab 分隔)。
+    差異模式一定會寫出檔案 (沒有變動時為空檔)，避免上次的檔案被誤傳。
+    """
+    frames = []
+    for n, (sheet_name, col_indexes) in enumerate(selections, 1):
+        if not col_indexes:
+            continue
+        if progress:
+            progress(0, None, f"工作表 {n}/{len(selections)} {sheet_name} 讀取中...")
+        with timer.span("read") as span:
+            df = shared_cache.get(file_path, sheet_name, read_as_text)
+            span.rows = len(df)
+        with timer.span("filter") as span:
+            frames.append(prepare_frame(df, col_indexes, fdf_layout))
+            span.rows = len(frames[-1])
+
+    if progress:
+        progress(0, None, "計算雜湊...")
+    rows = sum(len(df) for df in frames)
+    with timer.span("format", rows=rows):
+        if fdf_layout:
+            starts = np.cumsum([0] + [len(df) for df in frames]).tolist()
+            records = [encode_records(df, fdf_layout, encoding, start) for df, start in zip(frames, starts)]
+        else:
+            records = [format_frame(df) for df in frames]
+    with timer.span("hash", rows=rows):
+        texts = pd.concat([key_text(df, key_names) for df in frames] or [pd.Series([], dtype=object)],
+                          ignore_index=True)
+        keys = hash_values(texts)
+        hashes = np.concatenate([record_hashes(r) for r in records]) if records else np.zeros(0, np.uint64)
+
+    signature = _signature(fdf_layout, encoding)
+    m_path = manifest_path(save_path)
+    prev = load_manifest(m_path)
+    inserted, changed, deleted = compare(prev, keys, hashes, signature)
+    selected = inserted | changed
+
+    if progress:
+        progress(0, None, f"寫出差異 {int(selected.sum())} 筆...")
+    with timer.span("write", rows=int(selected.sum())):
+        with atomic_path(save_path) as tmp_path:
+            bounds = np.cumsum([0] + [len(r) for r in records])
+            parts = [r[selected[a:b]] for r, a, b in zip(records, bounds, bounds[1:])]
+            if fdf_layout:
+                if not write_encoded(tmp_path, parts, fdf_layout):
+                    open(tmp_path, "wb").close()
+            else:
+                write_lines(tmp_path, parts)
+
+        if deletions:
+            stem, ext = os.path.splitext(save_path)
+            gone = [] if prev is None else prev["key_text"][deleted].tolist()
+            with atomic_path(f"{stem}.deleted{ext}") as tmp_path:
+                write_lines(tmp_path, [gone])
+
+        save_manifest(m_path, keys, hashes, texts.to_numpy(dtype=object), signature)
+    return DeltaResult(int(inserted.sum()), int(changed.sum()), int(deleted.sum()), int((~selected).sum()))
@@ -2,6 +2,14 @@ import pandas as pd
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+from fieldExpr import ExprError, compile_expr
+from readerBackend import open_book
+from sidecarCache import read_cached
+from virtualTree import VirtualTreeview
+from workbookScanner import scan_headers
+from xlsxExport import export_frame
+
+
 class ExcelCustomizerApp:
     def __init__(self, root):
         self.root = root
@@ -51,7 +59,10 @@ class ExcelCustomizerApp:
         tk.Button(bottom_buttons_frame, text="輸出資料", command=self.export_data).pack(side="left", padx=5)
 
         self.excel_file = None
-        self.df = None
+        self.file_path = None
+        self.sheet_headers = {}
+        self.sheet_name = None
+        self.loaded = {}  # 目前工作表已讀取的欄位 {欄名: Series}，只讀有用到的欄
         self.columns = []
         self.preview_table = None
 
@@ -64,9 +75,16 @@ class ExcelCustomizerApp:
             return
         self.file_label.config(text=file_path)
         try:
-            self.excel_file = pd.ExcelFile(file_path)
-            self.sheet_option['values'] = self.excel_file.sheet_names
+            # 只讀各工作表標頭，資料等預覽時才依用到的欄位讀取
+            self.sheet_headers = scan_headers(file_path)
+            self.file_path = file_path
+            if self.excel_file is not None:
+                self.excel_file.close()
+            self.excel_file = open_book(file_path)
+            self.sheet_option['values'] = list(self.sheet_headers)
             self.sheet_option.set('')
+            self.sheet_name = None
+            self.loaded = {}
             self.columns = []
         except Exception as e:
             messagebox.showerror("錯誤", f"無法讀取 Excel 檔案:\n{e}")
@@ -75,11 +93,19 @@ class ExcelCustomizerApp:
         sheet_name = self.sheet_option.get()
         if not sheet_name:
             return
-        try:
-            self.df = pd.read_excel(self.excel_file, sheet_name=sheet_name)
-            self.columns = self.df.columns.tolist()
-        except Exception as e:
-            messagebox.showerror("錯誤", f"讀取工作表失敗:\n{e}")
+        self.sheet_name = sheet_name
+        self.loaded = {}
+        self.columns = list(self.sheet_headers.get(sheet_name, []))
+
+    def load_columns(self, names):
+        """只讀取 names 中還沒讀過的欄位 (usecols 依欄位位置)，回傳 {欄名: Series}"""
+        missing = [n for n in names if n not in self.loaded]
+        if missing:
+            positions = [self.columns.index(n) for n in missing]
+            part = read_cached(self.file_path, self.sheet_name, columns=positions, book=lambda: self.excel_file)
+            for i, name in enumerate(self.columns[p] for p in sorted(positions)):
+                self.loaded[name] = part.iloc[:, i]
+        return {n: self.loaded[n] for n in names}
 
     def add_custom_field(self):
         if not self.columns:
@@ -92,7 +118,8 @@ class ExcelCustomizerApp:
         name_entry = tk.Entry(field_frame, width=15)
         name_entry.pack(side="left")
 
-        options = ["==自定義資料=="] + self.columns
+        # ==運算式==：自定義值欄填運算式，例如 pad([代碼], 6) & "-" & roc([日期])
+        options = ["==自定義資料==", "==運算式=="] + self.columns
         column_combobox = ttk.Combobox(field_frame, values=options, state="readonly", width=15)
         column_combobox.pack(side="left", padx=5)
 
@@ -105,7 +132,7 @@ class ExcelCustomizerApp:
 
         def on_select(event):
             selected = column_combobox.get()
-            if selected == "==自定義資料==":
+            if selected in ("==自定義資料==", "==運算式=="):
                 value_entry.config(state="normal")
             else:
                 value_entry.delete(0, tk.END)
@@ -121,41 +148,67 @@ class ExcelCustomizerApp:
         self.custom_fields_container.children_list = [t for t in self.custom_fields_container.children_list if t[0] != frame]
 
     def preview_data(self):
-        if self.df is None or self.df.empty or not self.custom_fields_container.children_list:
+        if not self.columns or not self.custom_fields_container.children_list:
+            messagebox.showwarning("提醒", "請先選擇工作表並新增欄位")
+            return
+
+        fields = [(name_entry.get(), column_combobox.get(), value_entry)
+                  for _, name_entry, column_combobox, value_entry in self.custom_fields_container.children_list]
+        # 運算式先編譯 (同一段文字只解析一次)，順便得知引用了哪些欄位
+        exprs = {}
+        try:
+            for col_name, selected, value_entry in fields:
+                if selected == "==運算式==":
+                    exprs[col_name] = compile_expr(value_entry.get())
+        except ExprError as e:
+            messagebox.showerror("錯誤", f"運算式錯誤 ({col_name}):\n{e}")
+            return
+        refs = [sel for _, sel, _ in fields if sel in self.columns]
+        refs += [c for expr in exprs.values() for c in expr.columns]
+        unknown = [c for c in refs if c not in self.columns]
+        if unknown:
+            messagebox.showerror("錯誤", f"找不到欄位：{', '.join(unknown)}")
+            return
+        # 只讀有被引用的欄位；全是自定義資料時仍需一欄來決定筆數
+        used = list(dict.fromkeys(refs)) or self.columns[:1]
+        try:
+            source = self.load_columns(used)
+        except Exception as e:
+            messagebox.showerror("錯誤", f"讀取工作表失敗:\n{e}")
+            return
+        n_rows = len(next(iter(source.values())))
+        if n_rows == 0:
             messagebox.showwarning("提醒", "請先選擇工作表並新增欄位")
             return
 
         data = {}
-        for _, name_entry, column_combobox, value_entry in self.custom_fields_container.children_list:
-            col_name = name_entry.get()
-            selected = column_combobox.get()
+        for col_name, selected, value_entry in fields:
             if selected == "==自定義資料==":
-                data[col_name] = [value_entry.get()] * len(self.df)
+                data[col_name] = pd.Series(value_entry.get(), index=range(n_rows), dtype=object)
+            elif selected == "==運算式==":
+                try:
+                    data[col_name] = exprs[col_name].evaluate(source, n_rows)  # 整欄一次算完
+                except (ExprError, IndexError, OSError, TypeError, ValueError) as e:
+                    messagebox.showerror("錯誤", f"運算式錯誤 ({col_name}):\n{e}")
+                    return
             elif selected in self.columns:
-                data[col_name] = self.df[selected].tolist()
+                data[col_name] = source[selected]  # 直接引用已讀取的欄，不逐筆複製
             else:
                 continue  # 未勾選的欄位不加入
 
-        preview_df = pd.DataFrame(data)
+        preview_df = pd.DataFrame(data, copy=False)
 
         for widget in self.right_frame.winfo_children():
             widget.destroy()
 
-        self.preview_table = ttk.Treeview(self.right_frame)
+        self.preview_table = VirtualTreeview(self.right_frame)
         self.preview_table.pack(fill="both", expand=True)
-        self.preview_table["columns"] = list(preview_df.columns)
-        self.preview_table["show"] = "headings"
 
         # 自適應寬度
         total_width = self.right_frame.winfo_width() or 400
         col_count = len(preview_df.columns)
         col_width = max(total_width // col_count, 50)
-        for col in preview_df.columns:
-            self.preview_table.heading(col, text=col)
-            self.preview_table.column(col, width=col_width, anchor="center")
-
-        for _, row in preview_df.iterrows():
-            self.preview_table.insert("", "end", values=list(row))
+        self.preview_table.set_frame(preview_df, col_width=col_width)
 
         self.current_preview = preview_df
 
@@ -167,7 +220,7 @@ class ExcelCustomizerApp:
         if not file_path:
             return
         try:
-            self.current_preview.to_excel(file_path, index=False)
+            export_frame(file_path, self.current_preview)
             messagebox.showinfo("完成", f"已儲存 Excel: {file_path}")
         except Exception as e:
             messagebox.showerror("錯誤", f"儲存失敗:\n{e}")
@@ -1,64 +1,59 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import pandas as pd
+import numpy as np
 import os
-from openpyxl import load_workbook
-from openpyxl.styles import Font, Border, Side
+
+from jobRunner import JobRunner, atomic_path
+from readerBackend import read_sheet, sheet_names
+from runTimer import start_timer
+from xlsxExport import DATETIME_FORMAT, open_workbook, write_value
 
 # ===== 資料重排函式 =====
-def reshape_df(df, rows_per_page=50):
-    """把資料重排成每行兩筆，並在每頁插入標頭"""
-    group_size = len(df.columns)
-    rows = []
-    header = df.columns.tolist() + df.columns.tolist()
-
-    for i in range(0, len(df), 2):
-        row = []
-        row.extend(df.iloc[i].tolist())
-        if i + 1 < len(df):
-            row.extend(df.iloc[i + 1].tolist())
-        else:
-            row.extend([""] * group_size)
-        rows.append(row)
-
-    # 插入分頁標頭
-    final_rows = []
-    for i, row in enumerate(rows):
-        if i % rows_per_page == 0:
-            final_rows.append(header)
-        final_rows.append(row)
-
-    return pd.DataFrame(final_rows)
-
-# ===== 套用格式 (粗體 & 框線) =====
-def apply_formatting(filepath):
-    wb = load_workbook(filepath)
-    ws = wb.active
-
-    # 框線樣式
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
-    for row in ws.iter_rows():
-        for cell in row:
-            # 加框線
-            cell.border = thin_border
-            # 標頭列粗體 (判斷是否為第一列，或是插入的 header)
-            if cell.row == 1 or (ws.cell(row=cell.row, column=1).value == ws.cell(row=1, column=1).value):
-                cell.font = Font(bold=True)
-
-    wb.save(filepath)
+def reshape_df(df, n_up=2, rows_per_page=50):
+    """把資料重排成每行 n_up 筆，並在每頁插入標頭
+
+    回傳 (重排後的 object 陣列, 標頭列的列號)；不足一行的位置補空字串。
+    """
+    width = len(df.columns)
+    values = df.to_numpy(dtype=object)
+    pad = -len(values) % n_up
+    if pad:
+        values = np.vstack([values, np.full((pad, width), "", dtype=object)])
+    body = values.reshape(-1, width * n_up)
+
+    # 插入分頁標頭 (每 rows_per_page 行資料前一列)
+    header = np.array([str(c) for c in df.columns] * n_up, dtype=object)
+    starts = np.arange(0, len(body), rows_per_page)
+    packed = np.insert(body, starts, header, axis=0)
+    header_rows = starts + np.arange(len(starts))
+    return packed, header_rows
+
+
+# ===== 寫出 (寫入時直接套用粗體 / 框線 / 分頁) =====
+def write_packed(filepath, packed, header_rows):
+    border = {"border": 1}
+    with open_workbook(filepath) as wb:
+        ws = wb.add_worksheet()
+        cell_fmt = wb.add_format(border)
+        header_fmt = wb.add_format({**border, "bold": True})
+        date_fmt = wb.add_format({**border, "num_format": DATETIME_FORMAT})
+        is_header = np.zeros(len(packed), dtype=bool)
+        is_header[header_rows] = True
+
+        for r, row in enumerate(packed.tolist()):
+            fmt = header_fmt if is_header[r] else cell_fmt
+            for c, v in enumerate(row):
+                if not write_value(ws, r, c, v, fmt, date_fmt):
+                    ws.write_blank(r, c, None, fmt)
+        # 每個標頭列前分頁 (第一頁除外)
+        ws.set_h_pagebreaks([int(r) for r in header_rows[1:]])
 
 # ===== GUI 主程式 =====
 class ExcelApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Excel 資料重排工具")
-        self.root.geometry("600x250")
+        self.root.geometry("600x320")
 
         # 上方 Frame (選擇 Excel 檔案)
         frame_top = tk.Frame(root, pady=10)
@@ -78,6 +73,17 @@ class ExcelApp:
         self.sheet_combo = ttk.Combobox(frame_middle, state="readonly", width=30)
         self.sheet_combo.pack(side="left", padx=5)
 
+        # 排版設定
+        frame_layout = tk.Frame(root)
+        frame_layout.pack(fill="x")
+
+        tk.Label(frame_layout, text="每行筆數：").pack(side="left", padx=5)
+        self.n_up_var = tk.IntVar(value=2)
+        tk.Spinbox(frame_layout, from_=1, to=10, width=5, textvariable=self.n_up_var).pack(side="left")
+        tk.Label(frame_layout, text="每頁行數：").pack(side="left", padx=(20, 5))
+        self.rows_per_page_var = tk.IntVar(value=50)
+        tk.Spinbox(frame_layout, from_=1, to=500, width=5, textvariable=self.rows_per_page_var).pack(side="left")
+
         # 下方 Frame (產生 Excel)
         frame_bottom = tk.Frame(root, pady=20)
         frame_bottom.pack(fill="x")
@@ -85,6 +91,10 @@ class ExcelApp:
         btn_generate = tk.Button(frame_bottom, text="產生新 Excel", command=self.generate_excel)
         btn_generate.pack()
 
+        # 背景工作進度 / 取消
+        self.runner = JobRunner(root, root)
+        self.runner.frame.pack(fill="x", padx=10)
+
         # 狀態
         self.filepath = None
         self.sheets = []
@@ -99,8 +109,7 @@ class ExcelApp:
             self.file_label.config(text=os.path.basename(filepath))
 
             try:
-                xls = pd.ExcelFile(filepath)
-                self.sheets = xls.sheet_names
+                self.sheets = sheet_names(filepath)
                 self.sheet_combo["values"] = self.sheets
                 if self.sheets:
                     self.sheet_combo.current(0)
@@ -116,21 +125,47 @@ class ExcelApp:
             messagebox.showwarning("提醒", "請先選擇工作表")
             return
 
+        save_path = filedialog.asksaveasfilename(
+            title="另存新檔",
+            defaultextension=".xlsx",
+            filetypes=[("Excel 檔案", "*.xlsx")]
+        )
+        if not save_path:
+            return
+
         try:
-            df = pd.read_excel(self.filepath, sheet_name=self.sheet_combo.get())
-            reshaped_df = reshape_df(df, rows_per_page=50)  # 預設每頁 50 行
-
-            save_path = filedialog.asksaveasfilename(
-                title="另存新檔",
-                defaultextension=".xlsx",
-                filetypes=[("Excel 檔案", "*.xlsx")]
-            )
-            if save_path:
-                reshaped_df.to_excel(save_path, index=False, header=False)
-                apply_formatting(save_path)  # 套用粗體 & 框線
-                messagebox.showinfo("完成", f"已輸出新 Excel：\n{save_path}")
-        except Exception as e:
-            messagebox.showerror("錯誤", f"處理失敗：\n{e}")
+            n_up, rows_per_page = self.n_up_var.get(), self.rows_per_page_var.get()
+            if n_up < 1 or rows_per_page < 1:
+                raise ValueError
+        except (tk.TclError, ValueError):
+            messagebox.showwarning("提醒", "每行筆數與每頁行數須為正整數")
+            return
+
+        filepath, sheet_name = self.filepath, self.sheet_combo.get()
+        timer = start_timer("excelPrintPacker")
+
+        def work(job):
+            job.progress(0, 3, "讀取工作表...")
+            with timer.span("read") as span:
+                df = read_sheet(filepath, sheet_name)
+                span.rows = len(df)
+            job.progress(1, 3, "重排資料...")
+            with timer.span("format", rows=len(df)):
+                packed, header_rows = reshape_df(df, n_up, rows_per_page)
+            job.progress(2, 3, "寫出 Excel...")
+            with timer.span("write", rows=len(packed)), atomic_path(save_path) as tmp_path:
+                write_packed(tmp_path, packed, header_rows)  # 寫入時即套用粗體 & 框線
+            job.progress(3, 3)
+            return len(df)
+
+        def done(rows):
+            summary = timer.finish(save_path, rows, peak_rss=self.runner.peak_rss,
+                                   n_up=n_up, rows_per_page=rows_per_page)
+            if summary:
+                self.runner.set_status(summary)
+            messagebox.showinfo("完成", f"已輸出新 Excel：\n{save_path}")
+
+        self.runner.start(work, on_done=done)
 
 
 if __name__ == "__main__":
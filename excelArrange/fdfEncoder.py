@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+
+# ===== FDF 定長格式化 (整欄向量化) =====
+def as_text(series):
+    """整欄轉成字串，結果與逐筆 str(value) 相同"""
+    if series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+        return series.astype(str)
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.astype(str)
+    # 日期等其他型別：與 iterrows 取出的物件 str() 結果一致
+    return series.map(str).astype(str)
+
+
+def row_common_dtype(df):
+    """iterrows 會把整列轉成共同型別 (例如 int + float -> float)，這裡照做"""
+    dtypes = list(df.dtypes)
+    if not dtypes:
+        return None
+    if not all(isinstance(d, np.dtype) and d.kind in "iuf" for d in dtypes):
+        return None
+    common = np.result_type(*dtypes)
+    if all(d == common for d in dtypes):
+        return None
+    return common
+
+
+def encode_frame(df, layout):
+    """把 DataFrame 依 FDF 版面 (fdfSchema.FdfLayout) 轉成定長文字列 (回傳 Series)
+
+    欄位與 FDF 依序一一對應，多出來的一方會被忽略 (同原本 zip 的行為)。
+    """
+    common = row_common_dtype(df)
+    if common is not None:
+        df = df.astype(common)
+
+    parts = [
+        field.format_series(as_text(df.iloc[:, i]))
+        for i, field in zip(range(df.shape[1]), layout.fields)
+    ]
+    if not parts:
+        return pd.Series([""] * len(df), index=df.index, dtype=object)
+    if len(parts) == 1:
+        return parts[0]
+    return parts[0].str.cat(parts[1:])
+
+
+def encode_frame_loop(df, layout):
+    """原本 data2txtWithFDF.run 的逐列寫法，保留做為比對與效能基準"""
+    lines = []
+    for _, row in df.iterrows():
+        formatted_line = ""
+        for value, field in zip(row, layout.fields):
+            formatted_line += field.format_value(value)
+        lines.append(formatted_line)
+    return lines
+
+
+def write_lines(path, chunks, encoding="utf-8"):
+    """寫出多段文字列 (每段為 encode_frame 的結果)，每列結尾補換行"""
+    with open(path, "w", encoding=encoding) as f:
+        for chunk in chunks:
+            if len(chunk):
+                f.write("\n".join(chunk))
+                f.write("\n")
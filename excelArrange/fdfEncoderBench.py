@@ -0,0 +1,58 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from fdfEncoder import encode_frame, encode_frame_loop
+from fdfSchema import compile_fdf
+
+EXAMPLE_FDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "FormatDealer", "example.fdf")
+
+
+def make_frame(rows, seed=0):
+    """產生近似 USERMSP 的測試資料 (含空值、數字、過長字串)"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "PSDLMK": rng.choice(["", "D"], rows),
+        "PSKYCD": rng.integers(0, 99999, rows).astype(str),
+        "PSUSCD": rng.choice(["A01", "B2", "C003X"], rows),
+        "PSMODL": [f"MODEL-{i:08d}" for i in rng.integers(0, 10**8, rows)],
+        "PSAQTY": rng.integers(0, 10**6, rows),
+        "PSAPRC": np.round(rng.random(rows) * 10000, 2),
+        "PSADDT": rng.integers(1100101, 1141231, rows),
+        "PSADUS": rng.choice(["USER01", "管理者", None], rows),
+        "PSUPDT": rng.integers(1100101, 1141231, rows),
+        "PSUPUS": rng.choice(["USER02", "OPERATOR1234"], rows),
+    })
+    return df.fillna("")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FDF 定長格式化：逐列 vs 整欄向量化")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    layout = compile_fdf(EXAMPLE_FDF)
+
+    t0 = time.perf_counter()
+    expected = encode_frame_loop(df, layout)
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = encode_frame(df, layout).tolist()
+    t_vec = time.perf_counter() - t0
+
+    if result != expected:
+        raise SystemExit("輸出不一致！")
+
+    print(f"筆數      : {args.rows}")
+    print(f"逐列      : {t_loop:.3f} s")
+    print(f"整欄向量化: {t_vec:.3f} s")
+    print(f"加速      : {t_loop / t_vec:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import os
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+TYPE_TEXT = 1    # 文字 左對齊 補空白
+TYPE_NUMBER = 2  # 數字 右對齊 補0
+
+
+# ===== FDF 欄位 / 版面 (編譯後不可變) =====
+class FdfField(NamedTuple):
+    name: str
+    length: int
+    type: int
+    offset: int  # 在一筆記錄中的起始位置
+
+    @property
+    def end(self):
+        return self.offset + self.length
+
+    def format_value(self, value):
+        """單一值依欄位型別補齊 / 截斷"""
+        s = str(value)
+        if self.type == TYPE_TEXT:
+            return s.ljust(self.length)[:self.length]
+        if self.type == TYPE_NUMBER:
+            return s.rjust(self.length, "0")[:self.length]
+        return s[:self.length]
+
+    def format_series(self, text):
+        """整欄 (已是字串) 依欄位型別補齊 / 截斷"""
+        if self.type == TYPE_TEXT:
+            text = text.str.ljust(self.length)
+        elif self.type == TYPE_NUMBER:
+            text = text.str.rjust(self.length, "0")
+        return text.str.slice(0, self.length)
+
+
+class FdfLayout(NamedTuple):
+    fields: Tuple[FdfField, ...]
+    record_length: int
+    header: Tuple[Tuple[str, str], ...]   # [Data Transfer File Description]
+    options: Tuple[Tuple[str, str], ...]  # [Options]
+
+    @property
+    def names(self):
+        return [f.name for f in self.fields]
+
+    @property
+    def lengths(self):
+        return [f.length for f in self.fields]
+
+    @property
+    def offsets(self):
+        return [f.offset for f in self.fields]
+
+    def option(self, key, default=None):
+        return dict(self.options).get(key, default)
+
+
+# ===== 解析 =====
+def parse_fdf(text):
+    """把 FDF 文字內容編譯成 FdfLayout
+
+    [Options] 會保留在 layout.options；有 FieldCount 時會檢查欄位數是否一致。
+    """
+    sections = {}
+    order = []
+    current = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            current = line[1:-1]
+            sections.setdefault(current, {})
+            order.append(current)
+        elif "=" in line and current is not None:
+            k, v = line.split("=", 1)
+            sections[current][k.strip()] = v.strip()
+
+    header = sections.get("Data Transfer File Description", {})
+    options = sections.get("Options", {})
+
+    fields = []
+    offset = 0
+    for name in order:
+        if not (name.startswith("F") and name[1:].isdigit()):
+            continue
+        sec = sections[name]
+        try:
+            length = int(sec["Length"])
+        except (KeyError, ValueError):
+            raise ValueError(f"FDF 欄位 [{name}] 缺少正確的 Length")
+        field = FdfField(sec.get("Name", name), length, int(sec.get("Type", 0)), offset)
+        fields.append(field)
+        offset += length
+
+    if "FieldCount" in header and int(header["FieldCount"]) != len(fields):
+        raise ValueError(f"FDF 的 FieldCount={header['FieldCount']}，但實際有 {len(fields)} 個欄位")
+
+    return FdfLayout(tuple(fields), offset, tuple(header.items()), tuple(options.items()))
+
+
+@lru_cache(maxsize=32)
+def _compile_cached(path, mtime):
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_fdf(f.read())
+
+
+def compile_fdf(fdf_path):
+    """讀取並編譯 FDF 檔；同一路徑、檔案未修改時直接回傳快取的 layout"""
+    path = os.path.abspath(fdf_path)
+    return _compile_cached(path, os.path.getmtime(path))
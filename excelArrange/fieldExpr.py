@@ -0,0 +1,342 @@
+import ast
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from readerBackend import read_sheet
+
+
+class ExprError(ValueError):
+    pass
+
+
+# ===== 欄位運算式 (解析一次，編譯成整欄 pandas / NumPy 運算) =====
+# 語法：
+#   [欄名]            引用欄位 (欄名可含空白、中文)
+#   "文字" 123 1.5    常數
+#   a & b             字串串接 (同 Excel)
+#   + - * / %         數字運算；== != < <= > >=；and or not
+#   函式              見 FUNCS，例如 pad(left([代碼], 4), 6)、roc([日期])、iif([數量] > 0, "Y", "N")
+
+
+def _per_unique(s, fn):
+    """重複值只算一次：factorize 後對不重複值做 fn，再依代碼展開回整欄"""
+    codes, uniq = pd.factorize(s, use_na_sentinel=False)
+    if len(uniq) * 2 > len(s):
+        return fn(s)
+    out = fn(pd.Series(uniq, dtype=s.dtype if s.dtype.kind == "M" else object)).to_numpy()
+    return pd.Series(out[codes], index=s.index, dtype=object if out.dtype == object else out.dtype)
+
+
+def _text(s):
+    kind = s.dtype.kind
+    if kind == "f":
+        whole = s.notna() & np.isfinite(s) & (s % 1 == 0)
+        out = s.astype(str).astype(object)
+        out[whole] = s[whole].astype(np.int64).astype(str)
+        out[s.isna()] = ""
+        return out
+    if kind in "iub":
+        return s.astype(str).astype(object)
+    if kind == "M":
+        return s.dt.strftime("%Y-%m-%d").fillna("").astype(object)
+    return s.map(lambda v: "" if v is None or v is pd.NaT or v != v else
+                 str(int(v)) if isinstance(v, float) and v.is_integer() else str(v)).astype(object)
+
+
+def to_text(value):
+    """整欄轉字串：空值為 ""，整數值的 float 不帶 .0，日期為 YYYY-MM-DD"""
+    if not isinstance(value, pd.Series):
+        return "" if value is None else str(value)
+    if value.dtype.kind in "OU" or pd.api.types.is_string_dtype(value.dtype):
+        if pd.api.types.infer_dtype(value, skipna=True) in ("string", "empty"):
+            value = value.astype(object)
+            return value.fillna("") if value.hasnans else value
+    return _per_unique(value, _text).astype(object)
+
+
+def _num(value):
+    if isinstance(value, pd.Series):
+        if value.dtype.kind in "iufb":
+            return value
+        return pd.to_numeric(value, errors="coerce")
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+    return value
+
+
+def _text_op(fn):
+    """fn 作用在字串 Series 上；包成純量也能用、重複值只算一次"""
+    def op(x, *args):
+        if not isinstance(x, pd.Series):
+            return fn(pd.Series([to_text(x)], dtype=object), *args).iloc[0]
+        return _per_unique(x, lambda u: fn(to_text(u), *args))
+    return op
+
+
+def _dates(s):
+    if s.dtype.kind == "M":
+        return s
+    text = to_text(s).str.strip()
+    if text.str.fullmatch(r"\d{8}").all():
+        return pd.to_datetime(text, format="%Y%m%d", errors="coerce")  # 20240131
+    return pd.to_datetime(text, format="mixed", errors="coerce")
+
+
+def _date_op(fn):
+    """同 _text_op，但先把值轉成日期 (無法解析的為 NaT)"""
+    def op(x, *args):
+        if not isinstance(x, pd.Series):
+            x = pd.Series([x], dtype=object)
+            return fn(_dates(x), *args).iloc[0]
+        return _per_unique(x, lambda u: fn(_dates(u), *args))
+    return op
+
+
+def _right(s, n):
+    n = int(n)
+    return s.str.slice(-n) if n else s.str.slice(0, 0)
+
+
+def _mid(s, start, length):
+    """同 Excel MID：start 從 1 起算"""
+    a = int(start) - 1
+    return s.str.slice(a, a + int(length))
+
+
+def _date(dt, fmt="%Y%m%d"):
+    """日期重新格式化 (strftime 格式)，無法解析的為空字串"""
+    return dt.dt.strftime(str(fmt)).fillna("").astype(object)
+
+
+def _roc(dt):
+    """西元日期轉民國 yyyMMdd (AS/400 常用格式)"""
+    year = (dt.dt.year - 1911).astype("Int64").astype(str).str.zfill(3)
+    return (year + dt.dt.strftime("%m%d")).where(dt.notna(), "").astype(object)
+
+
+def _round(x, n=0):
+    return np.round(_num(x), int(n))
+
+
+def _iif(cond, a, b):
+    if not isinstance(cond, pd.Series):
+        return a if cond else b
+    out = np.where(cond.fillna(False).to_numpy(dtype=bool),
+                   a.to_numpy(dtype=object) if isinstance(a, pd.Series) else a,
+                   b.to_numpy(dtype=object) if isinstance(b, pd.Series) else b)
+    return pd.Series(out, index=cond.index, dtype=object)
+
+
+@lru_cache(maxsize=16)
+def _lookup_table(path, mtime, key, value):
+    if path.lower().endswith((".xlsx", ".xls")):
+        df = read_sheet(path, dtype=str)
+    else:
+        df = pd.read_csv(path, sep=None, engine="python", dtype=str, keep_default_na=False)
+    df.columns = [str(c).strip() for c in df.columns]
+    if key not in df.columns or value not in df.columns:
+        raise ExprError(f"對照檔 {os.path.basename(path)} 缺少欄位 {key} 或 {value}")
+    return dict(zip(df[key].str.strip(), df[value].str.strip()))
+
+
+def _lookup(x, path, key, value, default=""):
+    """依對照檔 (csv / txt / xlsx) 的 key 欄查 value 欄"""
+    path = os.path.abspath(str(path))
+    table = _lookup_table(path, os.path.getmtime(path), str(key), str(value))
+    return _text_op(lambda s: s.str.strip().map(table).fillna(default).astype(object))(x)
+
+
+def _tcode(x, default=""):
+    """以 ./data/tantof.txt (tcodeTransfer 的對照表) 查 TCODE"""
+    from tcodeIndex import load_index
+    table = load_index("./data/tantof.txt")
+    return _text_op(lambda s: s.str.strip().map(table).fillna(default).astype(object))(x)
+
+
+FUNCS = {
+    "text": to_text,
+    "num": _num,
+    "left": _text_op(lambda s, n: s.str.slice(0, int(n))),
+    "right": _text_op(_right),
+    "mid": _text_op(_mid),
+    "trim": _text_op(lambda s: s.str.strip()),
+    "upper": _text_op(lambda s: s.str.upper()),
+    "lower": _text_op(lambda s: s.str.lower()),
+    "len": _text_op(lambda s: s.str.len()),
+    "pad": _text_op(lambda s, n, ch="0": s.str.rjust(int(n), str(ch))),   # 左補字元到 n 位
+    "rpad": _text_op(lambda s, n, ch=" ": s.str.ljust(int(n), str(ch))),
+    "replace": _text_op(lambda s, old, new: s.str.replace(str(old), str(new), regex=False)),
+    "concat": lambda *xs: _concat(*xs),
+    "date": _date_op(_date),
+    "roc": _date_op(_roc),
+    "round": _round,
+    "iif": _iif,
+    "lookup": _lookup,
+    "tcode": _tcode,
+}
+
+
+# 各函式可接受的參數個數 (最少, 最多)；None 表示不限
+ARITY = {
+    "text": (1, 1), "num": (1, 1),
+    "left": (2, 2), "right": (2, 2), "mid": (3, 3),
+    "trim": (1, 1), "upper": (1, 1), "lower": (1, 1), "len": (1, 1),
+    "pad": (2, 3), "rpad": (2, 3), "replace": (3, 3), "concat": (1, None),
+    "date": (1, 2), "roc": (1, 1), "round": (1, 2), "iif": (3, 3),
+    "lookup": (4, 5), "tcode": (1, 2),
+}
+
+
+def _concat(*values):
+    out = ""
+    for v in values:
+        out = _cat(out, v)
+    return out
+
+
+def _cat(a, b):
+    return to_text(a) + to_text(b)
+
+
+BINARY = {
+    ast.Add: lambda a, b: _num(a) + _num(b),
+    ast.Sub: lambda a, b: _num(a) - _num(b),
+    ast.Mult: lambda a, b: _num(a) * _num(b),
+    ast.Div: lambda a, b: _num(a) / _num(b),
+    ast.Mod: lambda a, b: _num(a) % _num(b),
+    ast.BitAnd: _cat,
+}
+COMPARE = {
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+    ast.Lt: lambda a, b: _num(a) < _num(b),
+    ast.LtE: lambda a, b: _num(a) <= _num(b),
+    ast.Gt: lambda a, b: _num(a) > _num(b),
+    ast.GtE: lambda a, b: _num(a) >= _num(b),
+}
+
+
+# ===== 解析 =====
+def _split_columns(text):
+    """把 [欄名] 換成 Python 識別字，回傳 (程式碼, 欄名清單)；引號內的 [ ] 不處理"""
+    out, names = [], []
+    i, quote = 0, None
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            out.append(ch)
+            if ch == "\\" and i + 1 < len(text):
+                out.append(text[i + 1])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+            out.append(ch)
+        elif ch == "[":
+            end = text.find("]", i)
+            if end < 0:
+                raise ExprError("欄位引用缺少 ]")
+            name = text[i + 1:end].strip()
+            if name not in names:
+                names.append(name)
+            out.append(f"__col{names.index(name)}")
+            i = end
+        else:
+            out.append(ch)
+        i += 1
+    if quote:
+        raise ExprError("字串缺少結尾引號")
+    return "".join(out), names
+
+
+class CompiledExpr:
+    """編譯後的運算式：columns 為引用到的欄名，evaluate 一次算出整欄"""
+
+    def __init__(self, text, fn, columns):
+        self.text = text
+        self.columns = columns
+        self._fn = fn
+
+    def evaluate(self, source, n_rows):
+        """source: {欄名: Series}；回傳長度 n_rows 的 Series"""
+        missing = [c for c in self.columns if c not in source]
+        if missing:
+            raise ExprError(f"找不到欄位：{', '.join(missing)}")
+        cols = [source[c] for c in self.columns]
+        value = self._fn(cols)
+        if not isinstance(value, pd.Series):
+            index = cols[0].index if cols else pd.RangeIndex(n_rows)
+            value = pd.Series([value] * n_rows, index=index, dtype=object)
+        return value
+
+
+def _build(node, names):
+    """AST 節點轉成 fn(cols)，只允許白名單內的語法"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (str, int, float)):
+        v = node.value
+        return lambda cols: v
+    if isinstance(node, ast.Name):
+        m = re.fullmatch(r"__col(\d+)", node.id)
+        if m and int(m.group(1)) < len(names):
+            i = int(m.group(1))
+            return lambda cols: cols[i]
+        raise ExprError(f"不認得的名稱：{node.id} (欄位請用 [欄名])")
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY:
+        op, a, b = BINARY[type(node.op)], _build(node.left, names), _build(node.right, names)
+        return lambda cols: op(a(cols), b(cols))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        a = _build(node.operand, names)
+        return lambda cols: -_num(a(cols))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        a = _build(node.operand, names)
+
+        def negate(cols):
+            v = a(cols)
+            return ~v if isinstance(v, pd.Series) else not v
+        return negate
+    if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in COMPARE:
+        op = COMPARE[type(node.ops[0])]
+        a, b = _build(node.left, names), _build(node.comparators[0], names)
+        return lambda cols: op(a(cols), b(cols))
+    if isinstance(node, ast.BoolOp):
+        parts = [_build(v, names) for v in node.values]
+        is_and = isinstance(node.op, ast.And)
+
+        def boolop(cols):
+            result = parts[0](cols)
+            for p in parts[1:]:
+                result = (result & p(cols)) if is_and else (result | p(cols))
+            return result
+        return boolop
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = node.func.id.lower()
+        if name not in FUNCS:
+            raise ExprError(f"不支援的函式：{node.func.id}")
+        low, high = ARITY[name]
+        if len(node.args) < low or (high is not None and len(node.args) > high):
+            need = f"{low}" if low == high else f"{low} 以上" if high is None else f"{low}~{high}"
+            raise ExprError(f"函式 {node.func.id} 的參數個數應為 {need}，收到 {len(node.args)} 個")
+        func, args = FUNCS[name], [_build(a, names) for a in node.args]
+        return lambda cols: func(*(a(cols) for a in args))
+    raise ExprError(f"不支援的語法：{ast.dump(node)[:40]}")
+
+
+@lru_cache(maxsize=256)
+def compile_expr(text):
+    """解析運算式 (同一段文字只解析一次)，語法錯誤時丟出 ExprError"""
+    src, names = _split_columns(text.strip())
+    if not src.strip():
+        raise ExprError("運算式是空的")
+    try:
+        tree = ast.parse(src, mode="eval")
+    except SyntaxError as e:
+        raise ExprError(f"運算式語法錯誤：{e.msg}")
+    return CompiledExpr(text, _build(tree.body, names), names)
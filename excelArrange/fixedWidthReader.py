@@ -0,0 +1,128 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import as_strided
+
+from fdfSchema import TYPE_NUMBER, compile_fdf
+
+DEFAULT_ENCODING = "cp950"
+CHUNK_RECORDS = 1000000
+
+
+# ===== FDF 定長文字檔 -> DataFrame (memmap + 依位元組位置整欄切片) =====
+def _record_stride(mm, record_length):
+    """判斷每筆記錄後面的換行 (\\r\\n / \\n / 無)，回傳一筆佔用的位元組數"""
+    if len(mm) > record_length:
+        if mm[record_length] == 13 and len(mm) > record_length + 1 and mm[record_length + 1] == 10:
+            return record_length + 2
+        if mm[record_length] == 10:
+            return record_length + 1
+    return record_length
+
+
+def _record_view(path, layout):
+    """回傳 (n, record_length) 的 uint8 視圖，不複製資料"""
+    if os.path.getsize(path) == 0:
+        return np.zeros((0, layout.record_length), dtype=np.uint8)
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    stride = _record_stride(mm, layout.record_length)
+    # 最後一筆可能沒有換行
+    n = (len(mm) + stride - layout.record_length) // stride
+    if (n - 1) * stride + layout.record_length > len(mm):
+        raise ValueError(f"檔案長度與 FDF 記錄長度 {layout.record_length} 不符")
+    return as_strided(mm, shape=(n, layout.record_length), strides=(stride, 1), writeable=False)
+
+
+def _float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def _numbers(raw):
+    """數字欄：全是數字時直接用位數加權計算，其餘逐筆轉換
+
+    有空白或小數時逐筆保留型別 (整數仍為 int、小數為 float、空白為 NaN)，不因一筆小數把整欄轉成 float。
+    """
+    digits = raw.astype(np.int64) - 48
+    if raw.shape[1] <= 18 and ((digits >= 0) & (digits <= 9)).all():
+        weights = 10 ** np.arange(raw.shape[1] - 1, -1, -1, dtype=np.int64)
+        return digits @ weights
+    text = pd.Series(np.ascontiguousarray(raw).view(f"S{raw.shape[1]}").ravel())
+    text = text.str.decode("ascii", errors="replace").str.strip()
+    whole = text.str.fullmatch(r"[+-]?\d+").to_numpy(dtype=bool)
+    if whole.all() and raw.shape[1] <= 18:
+        return text.astype(np.int64)
+    # 不用 pd.to_numeric：前導 0 很多的長欄位 (例如 000000000000000001.5) 會被算成 0
+    return pd.Series([int(t) if w else _float(t) for t, w in zip(text, whole)], dtype=object)
+
+
+def _texts(raw, encoding):
+    fixed = np.ascontiguousarray(raw).view(f"S{raw.shape[1]}").ravel()
+    if (raw < 128).all():
+        # 純 ASCII：整欄在 C 層轉成 unicode，不逐筆 decode
+        return pd.Series(np.char.rstrip(fixed.astype(f"U{raw.shape[1]}"), " "), dtype=object)
+    return pd.Series(fixed).str.decode(encoding, errors="replace").str.rstrip(" ")
+
+
+def _decode(records, layout, encoding):
+    data = {}
+    for field in layout.fields:
+        raw = records[:, field.offset:field.end]
+        if field.type == TYPE_NUMBER:
+            data[field.name] = _numbers(raw)
+        else:
+            data[field.name] = _texts(raw, encoding)
+    return pd.DataFrame(data)
+
+
+def iter_fixed_width(path, fdf_path, encoding=DEFAULT_ENCODING, chunk_records=CHUNK_RECORDS):
+    """分段讀取，每次回傳最多 chunk_records 筆的 DataFrame"""
+    layout = compile_fdf(fdf_path)
+    records = _record_view(path, layout)
+    for start in range(0, len(records), chunk_records):
+        df = _decode(records[start:start + chunk_records], layout, encoding)
+        df.index = pd.RangeIndex(start, start + len(df))
+        yield df
+
+
+def read_fixed_width(path, fdf_path, encoding=DEFAULT_ENCODING, chunk_records=CHUNK_RECORDS):
+    """依 FDF 把 AS/400 下載的定長文字檔讀成 DataFrame
+
+    Type 2 欄位轉成數字 (int64；有空白或小數時為 object，整數仍為 int)，其他欄位為字串 (去尾端空白)。
+    """
+    chunks = list(iter_fixed_width(path, fdf_path, encoding, chunk_records))
+    if not chunks:
+        layout = compile_fdf(fdf_path)
+        return pd.DataFrame(columns=layout.names)
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="依 FDF 讀取定長文字檔 (例如 AS/400 下載檔)")
+    parser.add_argument("text_file")
+    parser.add_argument("fdf_file")
+    parser.add_argument("--encoding", default=DEFAULT_ENCODING)
+    parser.add_argument("--out", help="另存成 .xlsx 或 .csv 以便核對")
+    args = parser.parse_args(argv)
+
+    df = read_fixed_width(args.text_file, args.fdf_file, args.encoding)
+    print(f"共 {len(df)} 筆")
+    print(df.dtypes.to_string())
+    print(df.head(20).to_string())
+    if args.out:
+        if args.out.lower().endswith(".csv"):
+            df.to_csv(args.out, index=False, encoding="utf-8-sig")
+        else:
+            df.to_excel(args.out, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
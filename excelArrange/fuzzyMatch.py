@@ -0,0 +1,97 @@
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+NGRAM = 2
+MIN_SCORE = 0.5
+MAX_DF = 1000   # 出現在太多名稱裡的 n-gram (例如「公司」) 只用來驗證，不用來找候選
+TOP_K = 20      # 每個名稱先取前幾名候選，再精算分數
+
+
+# ===== 名稱正規化 =====
+def normalize(text):
+    """NFKC (全形轉半形、相容字轉標準字)、去掉所有空白、英文不分大小寫"""
+    text = unicodedata.normalize("NFKC", str(text))
+    return "".join(text.split()).casefold()
+
+
+def normalize_series(s):
+    return (s.astype(str).str.normalize("NFKC")
+            .str.replace(r"\s+", "", regex=True).str.casefold())
+
+
+def ngrams(text, n=NGRAM):
+    """字元 n-gram 集合；比 n 短的名稱整個當一個 gram"""
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+# ===== n-gram 反向索引 =====
+class NgramIndex:
+    """對照表名稱建成 n-gram -> 名稱編號 的反向索引
+
+    查詢時只看和輸入有共同 n-gram 的名稱，不逐一比對整張對照表；
+    分數為 Dice 係數 2|A∩B| / (|A|+|B|)，正規化後完全相同為 1。
+    """
+
+    def __init__(self, mapping, n=NGRAM, max_df=MAX_DF):
+        self.n = n
+        self.max_df = max_df
+        self.names = list(mapping.keys())
+        self.codes = list(mapping.values())
+        keys = normalize_series(pd.Series(self.names, dtype=object)).tolist()
+
+        self.exact = {}
+        self.grams = []
+        postings = defaultdict(list)
+        for i, key in enumerate(keys):
+            self.exact.setdefault(key, i)
+            g = ngrams(key, n)
+            self.grams.append(g)
+            for gram in g:
+                postings[gram].append(i)
+        self.postings = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+        self.gram_counts = np.array([len(g) for g in self.grams], dtype=np.int32)
+
+    def best(self, name):
+        """回傳 (對照表編號, 分數)；沒有候選時回傳 (None, 0.0)"""
+        key = normalize(name)
+        if key in self.exact:
+            return self.exact[key], 1.0
+        q = ngrams(key, self.n)
+        lists = sorted((self.postings[g] for g in q if g in self.postings), key=len)
+        if not lists:
+            return None, 0.0
+        # 常見 n-gram 不拿來找候選 (至少保留最少見的一個)
+        lists = [lists[0]] + [p for p in lists[1:] if len(p) <= self.max_df]
+        ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+        if len(ids) > TOP_K:
+            rough = 2 * shared / (len(q) + self.gram_counts[ids])
+            ids = ids[np.argpartition(-rough, TOP_K)[:TOP_K]]
+
+        best_id, best_score = None, 0.0
+        for i in ids.tolist():
+            score = 2 * len(q & self.grams[i]) / (len(q) + len(self.grams[i]))
+            if score > best_score:
+                best_id, best_score = i, score
+        return best_id, best_score
+
+    def match(self, names, min_score=MIN_SCORE):
+        """整欄比對 (相同名稱只算一次)，回傳 DataFrame[建議TNAME, 建議TCODE, 分數]
+
+        分數低於 min_score 的列建議欄位留空。
+        """
+        names = pd.Series(names).astype(str)
+        uniq = names.unique()
+        found = {}
+        for name in uniq:
+            i, score = self.best(name)
+            if i is None or score < min_score:
+                found[name] = ("", "", round(score, 3))
+            else:
+                found[name] = (self.names[i], self.codes[i], round(score, 3))
+        rows = [found[n] for n in names]
+        return pd.DataFrame(rows, columns=["建議TNAME", "建議TCODE", "分數"], index=names.index)
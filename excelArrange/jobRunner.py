@@ -0,0 +1,172 @@
+import os
+import queue
+import tempfile
+import threading
+import tkinter as tk
+from contextlib import contextmanager
+from tkinter import messagebox, ttk
+
+from memoryBudget import RssMonitor, format_bytes
+
+POLL_MS = 100
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# ===== 寫檔：先寫暫存檔，成功才換上正式檔名 =====
+@contextmanager
+def atomic_path(path):
+    """回傳暫存檔路徑；區塊正常結束才改名成 path，取消或失敗則刪除暫存檔
+
+    區塊內若自行刪掉暫存檔 (例如沒有資料)，則不產生 path。
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=os.path.splitext(path)[1], dir=folder)
+    os.close(fd)
+    try:
+        yield tmp_path
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# ===== 背景工作 =====
+class Job:
+    """傳給背景函式的控制物件：回報進度、檢查是否已取消"""
+
+    def __init__(self, messages):
+        self._messages = messages
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, done, total=None, text=None):
+        """回報進度 (同時檢查取消)；只會放進佇列，由主執行緒更新畫面"""
+        self.check()
+        self._messages.put(("progress", done, total, text))
+
+
+class JobRunner:
+    """在背景執行緒跑耗時工作，主執行緒用 root.after 更新進度條
+
+    work(job) 裡不可以碰 Tk 元件；結果交給 on_done 在主執行緒處理。
+    """
+
+    def __init__(self, root, parent):
+        self.root = root
+        self.job = None
+        self.peak_rss = 0  # 上一個工作期間的峰值 RSS (位元組)
+        self.messages = queue.Queue()
+
+        self.frame = tk.Frame(parent)
+        self.bar = ttk.Progressbar(self.frame, length=200, mode="determinate")
+        self.bar.pack(side="left", padx=5)
+        self.lbl_status = tk.Label(self.frame, text="", anchor="w")
+        self.lbl_status.pack(side="left", padx=5)
+        self.btn_cancel = tk.Button(self.frame, text="取消", command=self.cancel, state="disabled")
+        self.btn_cancel.pack(side="left", padx=5)
+
+    @property
+    def busy(self):
+        return self.job is not None
+
+    def start(self, work, on_done=None, text="處理中..."):
+        if self.busy:
+            messagebox.showwarning("提醒", "目前已有工作執行中")
+            return False
+        self.messages = queue.Queue()
+        self.job = Job(self.messages)
+        self.peak_rss = 0
+        self.on_done = on_done
+        self.bar.config(mode="indeterminate", value=0)
+        self.bar.start(10)
+        self.lbl_status.config(text=text)
+        self.btn_cancel.config(state="normal")
+
+        job, messages = self.job, self.messages
+
+        def target():
+            try:
+                with RssMonitor() as mem:
+                    result = work(job)
+                self.peak_rss = mem.peak
+                messages.put(("done", result))
+            except JobCancelled:
+                messages.put(("cancelled",))
+            except Exception as e:
+                messages.put(("error", e))
+
+        threading.Thread(target=target, daemon=True).start()
+        self.root.after(POLL_MS, self._poll)
+        return True
+
+    def set_status(self, text):
+        """工作結束後在狀態列顯示訊息 (例如執行時間摘要)，附上該工作的峰值記憶體"""
+        if self.peak_rss:
+            text += f"，峰值記憶體 {format_bytes(self.peak_rss)}"
+        self.lbl_status.config(text=text)
+
+    def cancel(self):
+        if self.job:
+            self.job._cancel.set()
+            self.lbl_status.config(text="取消中...")
+            self.btn_cancel.config(state="disabled")
+
+    def _finish(self, text):
+        self.job = None
+        self.bar.stop()
+        self.bar.config(mode="determinate", value=0)
+        self.lbl_status.config(text=text)
+        self.btn_cancel.config(state="disabled")
+
+    def _poll(self):
+        while True:
+            try:
+                msg = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            kind = msg[0]
+            if kind == "progress":
+                _, done, total, text = msg
+                if total:
+                    if str(self.bar["mode"]) != "determinate":
+                        self.bar.stop()
+                        self.bar.config(mode="determinate")
+                    self.bar.config(maximum=total, value=done)
+                if text and not self.job.cancelled:
+                    self.lbl_status.config(text=text)
+            elif kind == "done":
+                self._finish("完成")
+                self.set_status("完成")
+                if self.on_done:
+                    self.on_done(msg[1])
+                return
+            elif kind == "cancelled":
+                self._finish("已取消")
+                return
+            elif kind == "error":
+                self._finish("失敗")
+                messagebox.showerror("錯誤", f"處理失敗：\n{msg[1]}")
+                return
+        self.root.after(POLL_MS, self._poll)
+
+
+def confirm_full_load(estimate, reason):
+    """預估超過記憶體上限、又無法改用串流時詢問是否仍要整張讀入 (不默默整張讀入)"""
+    return messagebox.askyesno(
+        "記憶體不足",
+        f"預估需要 {format_bytes(estimate)}，超過記憶體上限 (MEMORY_BUDGET_MB)，{reason}。\n"
+        "仍要整張讀入嗎？記憶體不足時會失敗。",
+        icon="warning",
+    )
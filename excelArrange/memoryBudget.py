@@ -0,0 +1,137 @@
+import ctypes
+import os
+import sys
+import threading
+import zipfile
+
+from readerBackend import pick_engine
+from workbookScanner import scan_dimensions
+
+# 記憶體上限 (MB)，可用環境變數 MEMORY_BUDGET_MB 調整；預估超過時改用串流模式
+DEFAULT_BUDGET_MB = int(os.environ.get("MEMORY_BUDGET_MB", "2048"))
+SAMPLE_SECONDS = 0.05
+
+# 整張讀入時每個儲存格約需的位元組數 (openpyxl 解析暫存 + DataFrame + 快取)，
+# 以及勾選欄位另外的篩選副本 / 格式化結果；10 欄、200 欄的測試檔實測每格 75~120 B，取保守值
+READ_BYTES_PER_CELL = 100
+# calamine 較快但一次把整張表轉成 Python 物件再建 DataFrame，峰值較高 (200 欄測試檔實測每格約 126 B)
+CALAMINE_BYTES_PER_CELL = 150
+SELECTED_BYTES_PER_CELL = 40
+
+
+# ===== 目前 / 峰值 RSS (不需 psutil) =====
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    class _ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    def _counters():
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return None
+        return counters
+
+    def current_rss():
+        counters = _counters()
+        return counters.WorkingSetSize if counters else 0
+
+    def peak_rss():
+        """整個 process 啟動以來的最大 RSS (位元組)"""
+        counters = _counters()
+        return counters.PeakWorkingSetSize if counters else 0
+else:
+    import resource
+
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def current_rss():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            return peak_rss()
+
+    def peak_rss():
+        """整個 process 啟動以來的最大 RSS (位元組)"""
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssMonitor:
+    """背景執行緒定時取樣 RSS，記錄這段期間的峰值 (process 峰值無法歸零，所以自己量)
+
+    只量目前這個 process；平行模式的子 process 不含在內。
+    """
+
+    def __init__(self, interval=SAMPLE_SECONDS):
+        self.interval = interval
+        self.start_rss = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self.start_rss = self.peak = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+        return False
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+# ===== 讀檔前預估 =====
+def estimate_bytes(file_path, selections):
+    """依工作表列數 / 欄數 (不讀資料) 預估整張讀入匯出所需的記憶體
+
+    selections: [(sheet_name, [欄位 index, ...]), ...]
+    """
+    dims = scan_dimensions(file_path)
+    per_cell = CALAMINE_BYTES_PER_CELL if pick_engine(file_path) == "calamine" else READ_BYTES_PER_CELL
+    total = 0
+    for sheet_name, col_indexes in selections:
+        if not col_indexes or sheet_name not in dims:
+            continue
+        rows, cols = dims[sheet_name]
+        total += rows * (cols * per_cell + len(col_indexes) * SELECTED_BYTES_PER_CELL)
+    return total
+
+
+def check_budget(file_path, selections, budget_mb=None):
+    """回傳 (預估位元組數, 是否超過上限)；預估失敗時視為未超過"""
+    budget = (DEFAULT_BUDGET_MB if budget_mb is None else budget_mb) * 1024 * 1024
+    try:
+        estimate = estimate_bytes(file_path, selections)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return 0, False
+    # 已在記憶體裡的 DataFrame 也算在 process 目前用量內
+    return estimate, budget > 0 and current_rss() + estimate > budget
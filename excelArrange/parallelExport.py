@@ -0,0 +1,73 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from jobRunner import atomic_path
+from recordBuffer import DEFAULT_ENCODING, encode_block
+from runTimer import NULL_TIMER
+from sidecarCache import read_cached
+from textExport import format_frame, prepare_frame
+
+
+# ===== 平行匯出 (每個 process 讀取並格式化一張工作表，只傳回編碼好的位元組) =====
+def _text_bytes(lines):
+    """文字列轉成與 fdfEncoder.write_lines 寫出相同的位元組 (文字模式的換行轉換在這裡做)"""
+    if not len(lines):
+        return b""
+    text = "\n".join(lines) + "\n"
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+
+def _export_sheet(file_path, sheet_name, col_indexes, fdf_layout, encoding, as_text=False):
+    """讀取、處理並格式化一張工作表，回傳 (筆數, 位元組)；不把 DataFrame 傳回主 process"""
+    df_filtered = prepare_frame(read_cached(file_path, sheet_name, as_text), col_indexes, fdf_layout)
+    if fdf_layout:
+        return len(df_filtered), encode_block(df_filtered, fdf_layout, encoding).tobytes()
+    return len(df_filtered), _text_bytes(format_frame(df_filtered))
+
+
+def export_chunks(file_path, selections, fdf_layout=None, workers=None, progress=None,
+                  encoding=DEFAULT_ENCODING, as_text=False):
+    """各工作表平行處理，回傳依原順序排列的 (筆數, 位元組) (與逐張處理寫出的內容相同)
+
+    selections: [(sheet_name, [欄位 index, ...]), ...]
+    progress(done, total, text)：每完成一張工作表呼叫一次；丟出例外即中止。
+    """
+    selections = [(s, cols) for s, cols in selections if cols]
+    if not selections:
+        return []
+    workers = min(workers or os.cpu_count(), len(selections))
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [
+            pool.submit(_export_sheet, file_path, s, cols, fdf_layout, encoding, as_text)
+            for s, cols in selections
+        ]
+        chunks = []
+        for i, fut in enumerate(futures, 1):
+            chunks.append(fut.result())
+            if progress:
+                progress(i, len(futures), f"已完成 {i}/{len(futures)} 個工作表")
+        return chunks
+    finally:
+        # 正常結束時工作都已完成；中途取消則丟掉尚未開始的工作
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def export_text_parallel(file_path, selections, save_path, fdf_layout=None, progress=None,
+                         encoding=DEFAULT_ENCODING, timer=NULL_TIMER, as_text=False):
+    """export_chunks 後依序寫出，回傳輸出筆數 (0 筆時不產生檔案)
+
+    讀取與格式化在多個 process 同時進行，timer 只記為一段 parallel。
+    """
+    with timer.span("parallel") as span:
+        chunks = export_chunks(file_path, selections, fdf_layout, progress=progress, encoding=encoding,
+                               as_text=as_text)
+        count = span.rows = sum(rows for rows, _ in chunks)
+    if count:
+        with timer.span("write", rows=count), atomic_path(save_path) as tmp_path, open(tmp_path, "wb") as f:
+            for _, data in chunks:
+                f.write(data)
+    return count
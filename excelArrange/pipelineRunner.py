@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import NamedTuple
+
+import pandas as pd
+
+from fdfEncoder import as_text
+from fdfSchema import compile_fdf
+from fieldExpr import compile_expr
+from jobRunner import atomic_path
+from recordBuffer import DEFAULT_ENCODING, encode_block
+from sheetStream import chunk_frame, is_missing, iter_row_chunks
+from tcodeIndex import load_index
+from workbookScanner import scan_headers
+from xlsxExport import SheetAppender, open_workbook
+
+CHUNK_ROWS = 20000
+DEFAULT_MAPPING = "./data/tantof.txt"  # 同 tcodeTransfer
+MISSING_POLICIES = ("skip", "keep", "error")
+
+# ===== 管線規格 (JSON) =====
+# {
+#   "source":  {"file": "申請書.xlsx", "sheet": "Sheet1"},
+#   "fields": [                                      依 FDF 欄位順序
+#     {"name": "PSDLMK", "value": ""},               固定值
+#     {"name": "PSKYCD", "column": "代碼"},          抓取欄位
+#     {"name": "PSUSCD", "tcode": "擔當者"},         以 tantof.txt 把名稱對應成 TCODE
+#     {"name": "PSADDT", "expr": "roc([申請日])"}    運算式 (見 fieldExpr)
+#   ],
+#   "mapping": {"file": "./data/tantof.txt", "missing": "skip"},   skip / keep (留空) / error
+#   "fdf": "USERMSP.fdf",
+#   "encoding": "cp950",
+#   "output": "USERMSP.txt",
+#   "debug": {"picked": "picked.xlsx", "mapped": "mapped.xlsx"}    選填：中間結果另存 Excel
+# }
+# 規格中的相對路徑以規格檔所在目錄為準 (mapping 未指定時同 tcodeTransfer 用 ./data/tantof.txt)。
+
+
+class Field(NamedTuple):
+    name: str
+    kind: str      # value / column / tcode / expr
+    arg: object    # 固定值、來源欄名、或編譯後的運算式
+
+
+class PipelineSpec(NamedTuple):
+    source: str
+    sheet: object
+    fields: tuple
+    mapping: str
+    missing: str
+    fdf_layout: object
+    encoding: str
+    output: str
+    debug: dict
+
+
+class PipelineResult(NamedTuple):
+    rows_in: int
+    rows_out: int
+    unmatched: int
+    seconds: float
+
+
+def _path(base, path):
+    return path if os.path.isabs(path) else os.path.normpath(os.path.join(base, path))
+
+
+def _field(item):
+    name = item.get("name")
+    kinds = [k for k in ("value", "column", "tcode", "expr") if k in item]
+    if not name or len(kinds) != 1:
+        raise ValueError(f"欄位設定須有 name 與 value / column / tcode / expr 其中一項：{item}")
+    kind = kinds[0]
+    arg = compile_expr(item[kind]) if kind == "expr" else item[kind]
+    return Field(str(name), kind, arg)
+
+
+def parse_spec(spec, base_dir="."):
+    """dict 規格檢查並轉成 PipelineSpec，設定有誤時丟出 ValueError"""
+    try:
+        source = spec["source"]
+        fields = tuple(_field(item) for item in spec["fields"])
+        output = spec["output"]
+    except KeyError as e:
+        raise ValueError(f"規格缺少 {e.args[0]}")
+    if not fields:
+        raise ValueError("規格沒有任何欄位")
+
+    mapping = spec.get("mapping", {})
+    missing = mapping.get("missing", "skip")
+    if missing not in MISSING_POLICIES:
+        raise ValueError(f"mapping.missing 須為 {' / '.join(MISSING_POLICIES)}")
+
+    fdf_layout = compile_fdf(_path(base_dir, spec["fdf"])) if spec.get("fdf") else None
+    if fdf_layout and len(fdf_layout.fields) != len(fields):
+        raise ValueError(f"FDF 有 {len(fdf_layout.fields)} 個欄位，規格有 {len(fields)} 個")
+
+    return PipelineSpec(
+        source=_path(base_dir, source["file"]),
+        sheet=source.get("sheet", 0),
+        fields=fields,
+        mapping=_path(base_dir, mapping["file"]) if "file" in mapping else DEFAULT_MAPPING,
+        missing=missing,
+        fdf_layout=fdf_layout,
+        encoding=spec.get("encoding", DEFAULT_ENCODING),
+        output=_path(base_dir, output),
+        debug={k: _path(base_dir, v) for k, v in spec.get("debug", {}).items() if v},
+    )
+
+
+def load_spec(spec_path):
+    with open(spec_path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    return parse_spec(spec, os.path.dirname(os.path.abspath(spec_path)))
+
+
+# ===== 執行 (來源逐塊讀取 -> 抓取 / 運算 -> TCODE 對應 -> FDF 編碼，一次完成) =====
+def _source_columns(spec, headers):
+    """規格用到的來源欄位，回傳 (欄名清單, 欄位 index 清單)"""
+    names = []
+    for f in spec.fields:
+        refs = [f.arg] if f.kind in ("column", "tcode") else f.arg.columns if f.kind == "expr" else []
+        names.extend(r for r in refs if r not in names)
+    unknown = [n for n in names if n not in headers]
+    if unknown:
+        raise ValueError(f"來源工作表找不到欄位：{', '.join(unknown)}")
+    return names, [headers.index(n) for n in names]
+
+
+def _pick(spec, src, n):
+    """抓取 / 固定值 / 運算式欄位；tcode 欄位先放來源值"""
+    out = {}
+    for f in spec.fields:
+        if f.kind == "value":
+            out[f.name] = pd.Series(f.arg, index=src.index, dtype=object)
+        elif f.kind == "expr":
+            out[f.name] = f.arg.evaluate({c: src[c] for c in f.arg.columns}, n)
+        else:
+            out[f.name] = src[f.arg]
+    return pd.DataFrame(out, index=src.index, copy=False)
+
+
+def _map_tcode(spec, picked, mapping):
+    """tcode 欄位換成 TCODE，回傳 (結果, 有任一欄無對應的遮罩)"""
+    unmatched = pd.Series(False, index=picked.index)
+    mapped = picked.copy(deep=False)
+    for f in spec.fields:
+        if f.kind == "tcode":
+            codes = as_text(picked[f.name].fillna("")).str.strip().map(mapping)
+            unmatched |= codes.isna()
+            mapped[f.name] = codes.fillna("")
+    return mapped, unmatched
+
+
+def _drop_trailing_blank(chunks):
+    """來源欄全部空白的列先保留，後面還有資料才交出：結尾的空白列 (例如只有格式的儲存格) 不處理"""
+    held = []
+    for rows in chunks:
+        last = len(rows)
+        while last and all(is_missing(v) for v in rows[last - 1]):
+            last -= 1
+        if last:
+            yield held + rows[:last] if held else rows[:last]
+            held = rows[last:]
+        else:
+            held.extend(rows)
+
+
+def run_pipeline(spec, progress=None, chunk_rows=CHUNK_ROWS):
+    """依規格從來源 Excel 一次串流到最終文字檔，回傳 PipelineResult
+
+    中間結果不寫 Excel，除非規格有 debug；progress(done, total, text) 每個區塊呼叫一次。
+    """
+    t0 = time.perf_counter()
+    headers = scan_headers(spec.source)
+    sheet = list(headers)[spec.sheet] if isinstance(spec.sheet, int) else spec.sheet
+    if sheet not in headers:
+        raise ValueError(f"來源檔沒有工作表：{sheet}")
+    names, col_indexes = _source_columns(spec, headers[sheet])
+    if not col_indexes:
+        col_indexes, names = [0], ["__row__"]  # 全是固定值時仍需逐列讀取決定筆數
+    mapping = load_index(spec.mapping) if any(f.kind == "tcode" for f in spec.fields) else {}
+    newline = os.linesep  # 同 data2txt / data2txtWithFDF 以文字模式寫出的換行
+
+    rows_in = rows_out = unmatched_total = 0
+    with atomic_path(spec.output) as tmp_path, open(tmp_path, "wb") as out:
+        debug_books = {k: open_workbook(p) for k, p in spec.debug.items()}
+        try:
+            debug_sheets = {k: SheetAppender(b, k, [f.name for f in spec.fields]) for k, b in debug_books.items()}
+            for rows in _drop_trailing_blank(iter_row_chunks(spec.source, sheet, col_indexes, chunk_rows)):
+                src = chunk_frame(rows, names)
+                picked = _pick(spec, src, len(src))
+                mapped, unmatched = _map_tcode(spec, picked, mapping)
+                if "picked" in debug_sheets:
+                    debug_sheets["picked"].append(picked)
+                if "mapped" in debug_sheets:
+                    debug_sheets["mapped"].append(mapped)
+
+                if unmatched.any():
+                    if spec.missing == "error":
+                        first = rows_in + int(unmatched.to_numpy().argmax()) + 2
+                        raise ValueError(f"第 {first} 列的名稱在對照表中找不到 TCODE")
+                    if spec.missing == "skip":
+                        mapped = mapped[~unmatched]
+                unmatched_total += int(unmatched.sum())
+                rows_in += len(src)
+
+                mapped = mapped.fillna("")
+                if spec.fdf_layout:
+                    out.write(encode_block(mapped, spec.fdf_layout, spec.encoding, newline, rows_out))
+                elif len(mapped):
+                    parts = [as_text(mapped.iloc[:, i]) for i in range(mapped.shape[1])]
+                    lines = parts[0].str.cat(parts[1:]) if len(parts) > 1 else parts[0]
+                    out.write((newline.join(lines) + newline).encode(spec.encoding))
+                rows_out += len(mapped)
+                if progress:
+                    progress(rows_in, None, f"已處理 {rows_in} 筆，輸出 {rows_out} 筆")
+        finally:
+            for b in debug_books.values():
+                b.close()
+
+    return PipelineResult(rows_in, rows_out, unmatched_total, time.perf_counter() - t0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="依規格檔一次完成 抓取 -> TCODE 對應 -> FDF 文字檔")
+    parser.add_argument("spec", help="管線規格 (JSON)")
+    parser.add_argument("--source", help="覆寫規格中的來源 Excel")
+    parser.add_argument("--output", help="覆寫規格中的輸出檔")
+    parser.add_argument("--no-debug", action="store_true", help="不輸出規格中的 debug 中間檔")
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    if args.source:
+        spec = spec._replace(source=args.source)
+    if args.output:
+        spec = spec._replace(output=args.output)
+    if args.no_debug:
+        spec = spec._replace(debug={})
+
+    result = run_pipeline(spec, progress=lambda done, total, text: print(text, end="\r"))
+    print()
+    print(f"讀取 {result.rows_in} 筆, 輸出 {result.rows_out} 筆 -> {spec.output}")
+    if result.unmatched:
+        action = "已略過" if spec.missing == "skip" else "TCODE 留空"
+        print(f"無對應 TCODE：{result.unmatched} 筆 ({action})")
+    print(f"耗時 {result.seconds:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
-import pandas as pd
 from tkinter import Tk, filedialog
 
+from readerBackend import read_sheet, sheet_names
+
 # 1. 對話方塊讀取指定 xls / xlsx 檔案
 root = Tk()
 root.withdraw()  # 不顯示主視窗
@@ -13,14 +14,14 @@ if not file_path:
     print("未選擇檔案")
 else:
     # 所有工作表
-    excel_file = pd.ExcelFile(file_path)
+    names = sheet_names(file_path)
     print("所有工作表：")
-    print(excel_file.sheet_names)
+    print(names)
 
     # 指定工作表的第一行有哪些欄位
     sheet_name = input("請輸入要查看的工作表名稱: ")
-    if sheet_name in excel_file.sheet_names:
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+    if sheet_name in names:
+        df = read_sheet(file_path, sheet_name, nrows=0)
         print(f"\n工作表 {sheet_name} 的欄位：")
         print(df.columns.tolist())
     else:
@@ -0,0 +1,73 @@
+import os
+from importlib.util import find_spec
+
+import pandas as pd
+
+# ===== Excel 讀取引擎 (依副檔名選最快且已安裝的引擎) =====
+# calamine (pip install python-calamine) 以 Rust 解析，xlsx / xls 都比 openpyxl / xlrd 快數倍；
+# 未安裝時退回 pandas 原本的 openpyxl / xlrd。可用環境變數 EXCEL_ENGINE 強制指定 (例如 openpyxl)。
+ENGINE_PREFERENCE = {
+    ".xlsx": ("calamine", "openpyxl"),
+    ".xlsm": ("calamine", "openpyxl"),
+    ".xls": ("calamine", "xlrd"),
+    ".xlsb": ("calamine", "pyxlsb"),
+    ".ods": ("calamine", "odf"),
+}
+ENGINE_MODULES = {
+    "calamine": "python_calamine",
+    "openpyxl": "openpyxl",
+    "xlrd": "xlrd",
+    "pyxlsb": "pyxlsb",
+    "odf": "odf",
+}
+
+forced_engine = os.environ.get("EXCEL_ENGINE", "").strip().lower() or None
+_installed = {}
+
+
+def engine_installed(engine):
+    if engine not in _installed:
+        _installed[engine] = find_spec(ENGINE_MODULES.get(engine, engine)) is not None
+    return _installed[engine]
+
+
+def pick_engine(file_path):
+    """回傳讀這個檔案要用的引擎名稱 (pd.read_excel 的 engine 參數)"""
+    ext = os.path.splitext(str(file_path))[1].lower()
+    candidates = ENGINE_PREFERENCE.get(ext, ("openpyxl",))
+    if forced_engine:
+        if forced_engine not in ENGINE_MODULES:
+            raise ValueError(f"不支援的讀取引擎：{forced_engine}")
+        if engine_installed(forced_engine) and forced_engine in candidates:
+            return forced_engine
+    for engine in candidates:
+        if engine_installed(engine):
+            return engine
+    return candidates[-1]  # 都沒安裝時由 pandas 回報缺少哪個套件
+
+
+# ===== 共用讀取介面 (不論引擎，參數與回傳都相同) =====
+def open_book(file_path):
+    """開啟活頁簿 (pd.ExcelFile)，可重複 parse 多張工作表；用完請 close()"""
+    return pd.ExcelFile(file_path, engine=pick_engine(file_path))
+
+
+def sheet_names(file_path):
+    with open_book(file_path) as book:
+        return list(book.sheet_names)
+
+
+def sheet_headers(file_path):
+    """{工作表: [欄名, ...]}，只解析第一列 (欄名規則同 read_excel)"""
+    with open_book(file_path) as book:
+        return {name: list(book.parse(name, header=0, nrows=0).columns) for name in book.sheet_names}
+
+
+def read_sheet(source, sheet_name=0, header=0, usecols=None, skiprows=None, nrows=None, dtype=None):
+    """讀取工作表的指定範圍 (欄位 usecols、略過 skiprows 列後取 nrows 列)
+
+    source 可為檔案路徑或 open_book() 開啟的活頁簿；參數意義同 pd.read_excel。
+    """
+    kwargs = {} if isinstance(source, pd.ExcelFile) else {"engine": pick_engine(source)}
+    return pd.read_excel(source, sheet_name=sheet_name, header=header, usecols=usecols,
+                         skiprows=skiprows, nrows=nrows, dtype=dtype, **kwargs)
@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+
+from fdfEncoder import as_text, row_common_dtype
+from fdfSchema import TYPE_NUMBER
+from runTimer import NULL_TIMER
+
+DEFAULT_ENCODING = "cp950"
+CHUNK_ROWS = 50000
+SPACE, ZERO = 0x20, 0x30
+ASCII_COMPATIBLE = {"cp950", "big5", "big5hkscs", "utf-8", "utf8", "ascii", "cp1252", "ms950"}
+
+
+# ===== 定長記錄位元組緩衝 (依位元組補齊，直接寫入預先配置的區塊) =====
+def _cut(data, length, encoding):
+    """截到 length 位元組以內，且不切斷雙位元組字"""
+    cut = data[:length]
+    while cut:
+        try:
+            cut.decode(encoding)
+            return cut
+        except UnicodeDecodeError:
+            cut = cut[:-1]
+    return cut
+
+
+def _unencodable(values, encoding):
+    """回傳第一個無法以 encoding 編碼的 (列位置, 字元)"""
+    for i, v in enumerate(values):
+        try:
+            v.encode(encoding)
+        except UnicodeEncodeError as e:
+            return i, v[e.start:e.end]
+    return None
+
+
+def _fixed_bytes(text, length, encoding):
+    """整欄轉成 (n, length) uint8 與各列實際位元組數；不足處先填 0
+
+    有字元無法以 encoding 編碼時丟出 UnicodeEncodeError (不以 '?' 代替)。
+    """
+    n = len(text)
+    values = text.to_numpy(dtype=object)
+    if encoding.lower() in ASCII_COMPATIBLE:
+        try:
+            # 純 ASCII：字元數 = 位元組數，由 numpy 直接轉換
+            fixed = np.array(values, dtype=f"S{length}") if n else np.zeros(0, f"S{length}")
+            lens = np.minimum(text.str.len().to_numpy(dtype=np.int64), length)
+            return fixed.view(np.uint8).reshape(n, length), lens
+        except UnicodeEncodeError:
+            pass
+
+    encoded = [v.encode(encoding) for v in values]
+    lens = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=n)
+    for i in np.flatnonzero(lens > length):
+        encoded[i] = _cut(encoded[i], length, encoding)
+        lens[i] = len(encoded[i])
+    fixed = np.array(encoded, dtype=f"S{length}") if n else np.zeros(0, f"S{length}")
+    return fixed.view(np.uint8).reshape(n, length), lens
+
+
+def encode_field(text, field, encoding=DEFAULT_ENCODING, first_row=0):
+    """一個 FDF 欄位整欄編碼成 (n, length) 位元組
+
+    Type 2 右對齊補 '0'，其他型別左對齊補空白 (長度一律以位元組計)。
+    有字元無法以 encoding 編碼時丟出 ValueError，指出第幾筆 (first_row + 1 起算)、哪個欄位與字元。
+    """
+    try:
+        raw, lens = _fixed_bytes(text, field.length, encoding)
+    except UnicodeEncodeError:
+        i, ch = _unencodable(text.to_numpy(dtype=object), encoding)
+        raise ValueError(f"第 {first_row + i + 1} 筆的欄位 {field.name}：「{ch}」無法以 {encoding} 編碼"
+                         f" (值：{text.iloc[i]})") from None
+    cols = np.arange(field.length)
+    if field.type == TYPE_NUMBER:
+        src = cols[None, :] - (field.length - lens)[:, None]
+        shifted = np.take_along_axis(raw, np.clip(src, 0, None), axis=1)
+        return np.where(src >= 0, shifted, ZERO).astype(np.uint8)
+    return np.where(cols[None, :] < lens[:, None], raw, SPACE).astype(np.uint8)
+
+
+def encode_into(out, df, layout, encoding=DEFAULT_ENCODING, first_row=0):
+    """把 df 依 FDF 直接編碼進 out (n, record_length [+ 換行]) 的各欄位位元組區段
+
+    欄位比 FDF 少時，其餘欄位補空白，維持固定記錄長度。
+    first_row：df 第一列在整個輸出中是第幾筆 (0 起算)，只用於錯誤訊息。
+    """
+    common = row_common_dtype(df)
+    if common is not None:
+        df = df.astype(common)
+    for i, field in enumerate(layout.fields):
+        if i < df.shape[1]:
+            out[:, field.offset:field.end] = encode_field(as_text(df.iloc[:, i]), field, encoding, first_row)
+        else:
+            out[:, field.offset:field.end] = SPACE
+    return out
+
+
+def encode_records(df, layout, encoding=DEFAULT_ENCODING, first_row=0):
+    """回傳 (n, record_length) 的 uint8 陣列 (平行處理時由子 process 產生)"""
+    out = np.empty((len(df), layout.record_length), dtype=np.uint8)
+    return encode_into(out, df, layout, encoding, first_row)
+
+
+def _new_buffer(rows, layout, newline):
+    """一次配置 rows x (記錄長度 + 換行) 的連續緩衝區"""
+    buf = np.empty((rows, layout.record_length + len(newline)), dtype=np.uint8)
+    if newline:
+        buf[:, layout.record_length:] = np.frombuffer(newline, dtype=np.uint8)
+    return buf
+
+
+def encode_block(df, layout, encoding=DEFAULT_ENCODING, newline=os.linesep, first_row=0):
+    """編碼成含換行的 (n, 記錄長度 + 換行) 區塊，可直接 f.write (串流逐塊寫出時使用)"""
+    buf = _new_buffer(len(df), layout, newline.encode("ascii"))
+    encode_into(buf[:, :layout.record_length], df, layout, encoding, first_row)
+    return buf
+
+
+def write_records(path, frames, layout, encoding=DEFAULT_ENCODING, newline=os.linesep,
+                  progress=None, chunk_rows=CHUNK_ROWS, timer=NULL_TIMER):
+    """多個已處理好的 DataFrame 依 FDF 編碼後寫成定長檔，回傳筆數 (0 筆時不產生檔案)
+
+    各欄直接編碼進同一個預先配置的緩衝區，最後一次寫出。
+    progress(done, total, text)：每編碼完一個區塊呼叫一次。
+    """
+    total = sum(len(df) for df in frames)
+    if total == 0:
+        return 0
+    buf = _new_buffer(total, layout, newline.encode("ascii"))
+    row = 0
+    for df in frames:
+        for start in range(0, len(df), chunk_rows):
+            part = df.iloc[start:start + chunk_rows]
+            with timer.span("format", rows=len(part)):
+                encode_into(buf[row:row + len(part)], part, layout, encoding, row)
+            row += len(part)
+            if progress:
+                progress(row, total, f"已編碼 {row}/{total} 筆")
+    with timer.span("write", rows=total), open(path, "wb") as f:
+        f.write(buf)
+    return total
+
+
+def write_encoded(path, arrays, layout, newline=os.linesep):
+    """已編碼好的 (n, record_length) 陣列依序寫成定長檔，回傳筆數 (0 筆時不產生檔案)"""
+    total = sum(len(a) for a in arrays)
+    if total == 0:
+        return 0
+    buf = _new_buffer(total, layout, newline.encode("ascii"))
+    row = 0
+    for a in arrays:
+        buf[row:row + len(a), :layout.record_length] = a
+        row += len(a)
+    with open(path, "wb") as f:
+        f.write(buf)
+    return total
@@ -0,0 +1,143 @@
+import datetime
+import json
+import os
+import time
+
+from jobRunner import atomic_path
+
+# 設定環境變數 RUN_REPORT=1 才計時；未開啟時 span() 直接回傳共用的空物件，不呼叫計時器
+ENABLED = os.environ.get("RUN_REPORT", "").strip() not in ("", "0")
+REPORT_SUFFIX = ".run.json"
+
+STAGE_LABELS = {
+    "read": "讀取",
+    "filter": "篩選",
+    "format": "格式化",
+    "map": "對應",
+    "fuzzy": "模糊比對",
+    "hash": "雜湊",
+    "write": "寫出",
+    "parallel": "平行讀取/格式化",
+}
+
+
+class _NullSpan:
+    """未開啟計時時的 span：什麼都不做"""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("timer", "name", "rows", "t0")
+
+    def __init__(self, timer, name, rows):
+        self.timer = timer
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.t0, self.rows)
+        return False
+
+
+# ===== 各階段計時 (同名的 span 累加，例如分塊格式化) =====
+class RunTimer:
+    """一次執行的各階段時間；with timer.span("read", rows=n): ... 記錄一段
+
+    span 內才知道筆數時可設定 span.rows。
+    """
+
+    def __init__(self, tool, enabled=True):
+        self.tool = tool
+        self.enabled = enabled
+        self.started = datetime.datetime.now()
+        self.t0 = time.perf_counter()
+        self.stages = {}  # 名稱 -> [秒數, 筆數]，依第一次出現的順序
+        self.seconds = None
+        self.rows = None
+
+    def span(self, name, rows=None):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, rows)
+
+    def add(self, name, seconds, rows=None):
+        """直接加入一段已量好的時間 (例如工作開始前就做完的讀取)"""
+        if not self.enabled:
+            return
+        stage = self.stages.setdefault(name, [0.0, 0])
+        stage[0] += seconds
+        stage[1] += rows or 0
+
+    def stop(self, rows=None):
+        """結束計時 (整體秒數從建立時算起)"""
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self.t0
+        if rows is not None:
+            self.rows = int(rows)
+
+    def summary(self):
+        """例：讀取 1.20s / 格式化 0.31s / 寫出 0.05s，共 1.60s (31,250 筆/s)"""
+        self.stop()
+        parts = [f"{STAGE_LABELS.get(name, name)} {sec:.2f}s" for name, (sec, _) in self.stages.items()]
+        text = " / ".join(parts) + f"，共 {self.seconds:.2f}s"
+        if self.rows and self.seconds:
+            text += f" ({self.rows / self.seconds:,.0f} 筆/s)"
+        return text
+
+    def report(self, output=None, **extra):
+        self.stop()
+        return {
+            "tool": self.tool,
+            "started": self.started.isoformat(timespec="seconds"),
+            "output": output,
+            "seconds": round(self.seconds, 4),
+            "rows": self.rows,
+            "rows_per_s": round(self.rows / self.seconds) if self.rows and self.seconds else None,
+            "stages": [
+                {"name": name, "seconds": round(sec, 4), "rows": rows or None,
+                 "rows_per_s": round(rows / sec) if rows and sec else None}
+                for name, (sec, rows) in self.stages.items()
+            ],
+            **extra,
+        }
+
+    def finish(self, output, rows=None, **extra):
+        """結束計時並在輸出檔旁寫 <輸出檔>.run.json，回傳狀態列要顯示的摘要
+
+        未開啟計時時不寫檔、回傳 None。
+        """
+        if not self.enabled:
+            return None
+        self.stop(rows)
+        try:
+            with atomic_path(output + REPORT_SUFFIX) as tmp_path:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.report(output, **extra), f, ensure_ascii=False, indent=2)
+        except OSError:
+            pass  # 報告寫不出來不影響輸出結果
+        return self.summary()
+
+
+NULL_TIMER = RunTimer("", enabled=False)
+
+
+def start_timer(tool):
+    """依 RUN_REPORT 設定回傳計時器 (未開啟時為共用的 NULL_TIMER)"""
+    return RunTimer(tool) if ENABLED else NULL_TIMER
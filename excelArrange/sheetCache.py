@@ -0,0 +1,86 @@
+import os
+import threading
+from collections import OrderedDict
+
+from readerBackend import open_book
+from sidecarCache import read_cached
+
+# 快取上限 (MB)，可用環境變數 SHEET_CACHE_MB 調整
+DEFAULT_MAX_BYTES = int(os.environ.get("SHEET_CACHE_MB", "512")) * 1024 * 1024
+
+
+# ===== 工作表 DataFrame 快取 (路徑 + mtime + 工作表，LRU) =====
+class SheetCache:
+    """讀過的工作表留在記憶體，重複預覽 / 匯出時不再重新解析 Excel (記憶體沒有時再找磁碟快取)
+
+    檔案在磁碟上被修改 (mtime 改變) 時，舊的快取會自動丟棄。
+    回傳的 DataFrame 為共用物件，呼叫端請勿就地修改。
+    背景工作與畫面可能同時讀取，所以存取都加鎖。
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._sheets = OrderedDict()  # (path, mtime, sheet, as_text) -> (df, nbytes)
+        self._books = {}              # path -> (mtime, pd.ExcelFile)
+        self.total_bytes = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _stat(file_path):
+        path = os.path.abspath(file_path)
+        return path, os.path.getmtime(path)
+
+    def _drop_stale(self, path, mtime):
+        for key in [k for k in self._sheets if k[0] == path and k[1] != mtime]:
+            self._remove(key)
+        book = self._books.get(path)
+        if book and book[0] != mtime:
+            book[1].close()
+            del self._books[path]
+
+    def _remove(self, key):
+        _, nbytes = self._sheets.pop(key)
+        self.total_bytes -= nbytes
+
+    def book(self, file_path):
+        """取得 (並快取) 該檔案的 pd.ExcelFile (引擎依 readerBackend 選擇)"""
+        path, mtime = self._stat(file_path)
+        with self._lock:
+            self._drop_stale(path, mtime)
+            if path not in self._books:
+                self._books[path] = (mtime, open_book(path))
+            return self._books[path][1]
+
+    def get(self, file_path, sheet_name, as_text=False):
+        """取得工作表 (第一列為標頭)，沒有快取才解析
+
+        as_text=True 時以文字讀取 (textReader)，與一般讀取分開快取。
+        """
+        path, mtime = self._stat(file_path)
+        key = (path, mtime, sheet_name, as_text)
+        with self._lock:
+            self._drop_stale(path, mtime)  # 文字讀取 / 磁碟快取不經過 book()，這裡也要丟掉舊版
+            if key in self._sheets:
+                self._sheets.move_to_end(key)
+                return self._sheets[key][0]
+
+            df = read_cached(path, sheet_name, as_text, book=lambda: self.book(path))
+            nbytes = int(df.memory_usage(deep=True).sum())
+            if nbytes <= self.max_bytes:
+                self._sheets[key] = (df, nbytes)
+                self.total_bytes += nbytes
+                while self.total_bytes > self.max_bytes:
+                    self._remove(next(iter(self._sheets)))
+            return df
+
+    def clear(self):
+        with self._lock:
+            self._sheets.clear()
+            self.total_bytes = 0
+            for _, book in self._books.values():
+                book.close()
+            self._books.clear()
+
+
+# 各工具共用的快取
+shared_cache = SheetCache()
@@ -0,0 +1,158 @@
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from jobRunner import atomic_path
+from readerBackend import read_sheet
+from recordBuffer import DEFAULT_ENCODING, encode_block
+from runTimer import NULL_TIMER
+
+
+# pd.read_excel 預設視為空值的字串
+NA_TEXTS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+}
+
+
+# ===== 串流讀取 (openpyxl read-only，一次只保留一個區塊) =====
+def is_missing(value):
+    return value is None or (isinstance(value, str) and value in NA_TEXTS)
+
+
+def cell_text(value):
+    """單一儲存格轉字串，規則比照 pd.read_excel 後再 astype(str)"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # read_excel 會把整數值的 float 轉回 int
+    return str(value)
+
+
+def iter_row_chunks(file_path, sheet_name, col_indexes, chunk_size=5000):
+    """逐區塊讀出工作表資料列 (略過第一列標頭)，每列只取指定欄位
+
+    .xlsx 走 openpyxl read-only 串流；.xls 無法串流，整張讀入後再分塊。
+    整列空白的列先記下，後面還有資料才輸出：結尾的空白列 (只有格式的儲存格) 同 read_excel 不輸出。
+    """
+    if str(file_path).lower().endswith(".xls"):
+        df = read_sheet(file_path, sheet_name)
+        df = df.iloc[:, col_indexes]
+        for start in range(0, len(df), chunk_size):
+            part = df.iloc[start:start + chunk_size].astype(object)
+            yield [
+                tuple(None if pd.isna(v) else v for v in row)
+                for row in part.itertuples(index=False, name=None)
+            ]
+        return
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        chunk = []
+        empty_rows = 0  # 目前連續的空白列數
+        blank = (None,) * len(col_indexes)
+        for row in ws.iter_rows(min_row=2, values_only=True):
+            if all(v is None or v == "" for v in row):
+                empty_rows += 1
+                continue
+            while empty_rows:
+                chunk.append(blank)
+                empty_rows -= 1
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            chunk.append(tuple(row[i] if i < len(row) else None for i in col_indexes))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        wb.close()
+
+
+def chunk_frame(rows, names):
+    """串流讀出的列轉成 DataFrame；空值為 None，整數值的 float 轉回 int (同 read_excel)"""
+    cols = list(zip(*rows))
+    data = {
+        name: [None if is_missing(v) else int(v) if isinstance(v, float) and v.is_integer() else v
+               for v in col]
+        for name, col in zip(names, cols)
+    }
+    return pd.DataFrame(data, index=range(len(rows)), dtype=object)
+
+
+def stream_concat(file_path, selections, save_path, chunk_size=5000, encoding="utf-8", progress=None,
+                  timer=NULL_TIMER):
+    """串流版 data2txt：每列勾選欄位直接串接，邊讀邊寫
+
+    selections: [(sheet_name, [欄位 index, ...]), ...]
+    含空白儲存格的列會被略過 (同 dropna)。回傳寫出的列數 (0 筆時不產生檔案)。
+    progress(done, total, text)：每寫完一個區塊呼叫一次。
+    timer: 讀取、篩選 + 串接、寫出分別累計 (read / format / write)。
+    """
+    count = 0
+    with atomic_path(save_path) as tmp_path:
+        with open(tmp_path, "w", encoding=encoding) as f:
+            for sheet_name, col_indexes in selections:
+                if not col_indexes:
+                    continue
+                chunks = iter_row_chunks(file_path, sheet_name, col_indexes, chunk_size)
+                while True:
+                    with timer.span("read") as span:
+                        chunk = next(chunks, None)
+                        span.rows = len(chunk) if chunk else 0
+                    if chunk is None:
+                        break
+                    with timer.span("format") as span:
+                        lines = [
+                            "".join(cell_text(v) for v in row)
+                            for row in chunk
+                            if not any(is_missing(v) for v in row)
+                        ]
+                        span.rows = len(lines)
+                    if lines:
+                        with timer.span("write", rows=len(lines)):
+                            f.write("\n".join(lines))
+                            f.write("\n")
+                            f.flush()
+                        count += len(lines)
+                    if progress:
+                        progress(count, None, f"{sheet_name} 已寫出 {count} 筆")
+        if count == 0:
+            os.remove(tmp_path)
+    return count
+
+
+def stream_records(file_path, selections, save_path, fdf_layout, encoding=DEFAULT_ENCODING, chunk_size=5000,
+                   progress=None, timer=NULL_TIMER):
+    """串流版 data2txtWithFDF：逐塊讀出勾選欄位、依 FDF 編碼後寫出
+
+    空值補空字串 (同 prepare_frame)；整數值的 float 寫成整數 (例如 72.0 -> 72)。
+    回傳寫出的筆數 (0 筆時不產生檔案)。
+    """
+    count = 0
+    with atomic_path(save_path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            for sheet_name, col_indexes in selections:
+                if not col_indexes:
+                    continue
+                chunks = iter_row_chunks(file_path, sheet_name, col_indexes, chunk_size)
+                while True:
+                    with timer.span("read") as span:
+                        chunk = next(chunks, None)
+                        span.rows = len(chunk) if chunk else 0
+                    if chunk is None:
+                        break
+                    with timer.span("format", rows=len(chunk)):
+                        df = chunk_frame(chunk, range(len(col_indexes))).fillna("")
+                        block = encode_block(df, fdf_layout, encoding, first_row=count)
+                    with timer.span("write", rows=len(chunk)):
+                        f.write(block)
+                    count += len(chunk)
+                    if progress:
+                        progress(count, None, f"{sheet_name} 已寫出 {count} 筆")
+        if count == 0:
+            os.remove(tmp_path)
+    return count
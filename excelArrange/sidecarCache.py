@@ -0,0 +1,208 @@
+import datetime
+import hashlib
+import json
+import os
+import threading
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+from jobRunner import atomic_path
+from readerBackend import pick_engine, read_sheet
+from tcodeIndex import file_hash
+from textReader import read_sheet_text
+
+# ===== 工作表的磁碟快取 (Arrow IPC / Feather，未壓縮可 memory-map) =====
+# 第一次讀工作表時另存一份 .feather，之後任何工具開同一個檔案 (內容雜湊 + mtime 相同) 直接載入，不再解析 Excel。
+# 需安裝 pyarrow；未安裝或環境變數 SIDECAR_CACHE=0 時不使用。
+# 目錄 / 上限 (MB) 可用 SIDECAR_CACHE_DIR / SIDECAR_CACHE_MB 調整，超過上限時刪最久沒用到的。
+ENABLED = os.environ.get("SIDECAR_CACHE", "1").strip() != "0" and find_spec("pyarrow") is not None
+DEFAULT_DIR = os.environ.get("SIDECAR_CACHE_DIR") or os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.cache"), "PandasDataCatcher", "sheets")
+DEFAULT_MAX_BYTES = int(os.environ.get("SIDECAR_CACHE_MB", "4096")) * 1024 * 1024
+CACHE_SUFFIX = ".feather"
+CACHE_VERSION = 2
+META_KEY = b"excelArrange"
+
+
+# 混合型別欄 / 欄名逐格轉成「型別代號:文字」，載入時依代號還原 (快取目錄可能共用，不用 pickle)
+_TAGGED = (
+    ("b", bool, lambda v: "1" if v else "0", lambda t: t == "1"),
+    ("i", (int, np.integer), lambda v: str(int(v)), int),
+    ("f", (float, np.floating), lambda v: repr(float(v)), float),
+    ("s", str, str, str),
+    ("T", pd.Timestamp, lambda v: v.isoformat(), pd.Timestamp),
+    ("t", datetime.datetime, lambda v: v.isoformat(), datetime.datetime.fromisoformat),
+    ("d", datetime.date, lambda v: v.isoformat(), datetime.date.fromisoformat),
+    ("h", datetime.time, lambda v: v.isoformat(), datetime.time.fromisoformat),
+    ("l", datetime.timedelta, lambda v: str(pd.Timedelta(v).value), lambda t: pd.Timedelta(int(t)).to_pytimedelta()),
+)
+_DECODE = {tag: decode for tag, _, _, decode in _TAGGED}
+
+
+def _tag(value):
+    """一格轉成帶型別代號的文字 (None / NaT 為 None)；不支援的型別丟出 TypeError"""
+    if value is None or value is pd.NaT:
+        return None
+    for tag, types, encode, _ in _TAGGED:
+        if isinstance(value, types):
+            return f"{tag}:{encode(value)}"
+    raise TypeError(f"不支援快取的型別：{type(value).__name__}")
+
+
+def _untag(text):
+    if not isinstance(text, str):  # 空格 (Arrow 讀回來可能是 None 或 NaN)
+        return None
+    tag, _, body = text.partition(":")
+    return _DECODE[tag](body)
+
+
+class SidecarCache:
+    """工作表 DataFrame 存成 .feather (欄名以位置命名，原欄名 / dtype 以 JSON 另存在 metadata)
+
+    Arrow 沒有對應型別的欄 (例如同一欄混了數字與文字) 逐格轉成帶型別代號的文字，載入時還原；
+    有其他型別時不快取該工作表。
+    以快取檔的 mtime 記錄最後使用時間 (LRU)；多個 process 共用同一個目錄。
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES, enabled=ENABLED):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._digests = {}  # (path, size, mtime_ns) -> 內容雜湊，同一個 process 不重算
+        self._lock = threading.Lock()
+
+    def _digest(self, file_path):
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        key = (path, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is None:
+            digest = file_hash(path)
+            with self._lock:
+                self._digests[key] = digest
+        return digest, st.st_mtime_ns
+
+    def entry_path(self, file_path, sheet_name, variant):
+        digest, mtime_ns = self._digest(file_path)
+        key = f"{CACHE_VERSION}|{digest}|{mtime_ns}|{sheet_name}|{variant}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + CACHE_SUFFIX)
+
+    def load(self, file_path, sheet_name, variant, columns=None):
+        """有快取時回傳 DataFrame (columns: 只讀這些欄位位置)，沒有時回傳 None"""
+        if not self.enabled:
+            return None
+        import pyarrow as pa
+        from pyarrow import feather
+
+        try:
+            entry = self.entry_path(file_path, sheet_name, variant)
+            if not os.path.exists(entry):
+                return None
+            fields = None if columns is None else [str(i) for i in sorted(columns)]
+            table = feather.read_table(entry, columns=fields, memory_map=True)
+            meta = json.loads(table.schema.metadata[META_KEY])
+            names = [_untag(n) for n in meta["names"]]
+            object_cols, tagged_cols = set(meta["object"]), set(meta["tagged"])
+            os.utime(entry)  # 記錄最後使用時間
+        except (OSError, KeyError, TypeError, ValueError, pa.ArrowException):
+            return None
+
+        positions = [int(f) for f in table.column_names]
+        df = table.to_pandas()
+        df.columns = [names[i] for i in positions]
+        objects = [names[i] for i in positions if i in object_cols and i not in tagged_cols]
+        if objects:
+            df[objects] = df[objects].astype(object)
+        for j, i in enumerate(positions):
+            if i in tagged_cols:
+                values = [_untag(t) for t in df.iloc[:, j]]
+                df.isetitem(j, pd.Series(values, index=df.index, dtype=object))
+        return df
+
+    def store(self, file_path, sheet_name, variant, df):
+        """另存一份快取；存不下 (型別不支援、磁碟問題) 時回傳 False，不影響呼叫端"""
+        if not self.enabled:
+            return False
+        import pyarrow as pa
+        from pyarrow import feather
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entry = self.entry_path(file_path, sheet_name, variant)
+            positional = df.set_axis([str(i) for i in range(df.shape[1])], axis=1)
+            object_cols = {i for i, dtype in enumerate(df.dtypes) if dtype == object}
+            tagged_cols = set()
+            for i in object_cols:
+                try:
+                    pa.array(positional.iloc[:, i], from_pandas=True)
+                except pa.ArrowException:
+                    tagged_cols.add(i)
+                    tagged = [_tag(v) for v in positional.iloc[:, i]]
+                    positional.isetitem(i, pd.Series(tagged, index=positional.index, dtype=object))
+            table = pa.Table.from_pandas(positional, preserve_index=False)
+            meta = json.dumps({"names": [_tag(n) for n in df.columns], "object": sorted(object_cols),
+                               "tagged": sorted(tagged_cols)}).encode("utf-8")
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), META_KEY: meta})
+            with atomic_path(entry) as tmp_path:
+                feather.write_feather(table, tmp_path, compression="uncompressed")
+        except (OSError, TypeError, ValueError, pa.ArrowException):
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """總大小超過上限時，從最久沒用到的快取檔開始刪"""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(CACHE_SUFFIX)]
+            stats = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in stats:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass  # 其他 process 正在使用 (Windows)，下次再刪
+
+    def clear(self):
+        with self._lock:
+            self._digests.clear()
+        max_bytes, self.max_bytes = self.max_bytes, 0
+        self.evict()
+        self.max_bytes = max_bytes
+
+
+# 各工具共用的磁碟快取
+sidecar_cache = SidecarCache()
+
+
+def read_cached(file_path, sheet_name, as_text=False, header=0, columns=None, book=None):
+    """讀取工作表：先找磁碟快取，沒有才解析 Excel 並另存一份
+
+    as_text / header 同 textReader.read_sheet_text (header 只支援 0 / None)；
+    columns: 只取這些欄位位置 (依位置排序)。有快取時只載入這幾欄；沒有快取時以 usecols 只解析這幾欄、
+    不另存 (快取是整張表，不為了存快取多解析其他欄)；文字讀取本來就解析整張表，仍會另存；
+    book: 回傳已開啟 pd.ExcelFile 的函式，沒有快取、需要解析時才呼叫 (一般讀取時沿用)。
+    """
+    # 換讀取引擎 (EXCEL_ENGINE / 強制引擎) 時結果可能不同，不沿用其他引擎的快取
+    variant = ("text" if as_text else "value") + ("" if header == 0 else "_noheader") + "|" + pick_engine(file_path)
+    df = sidecar_cache.load(file_path, sheet_name, variant, columns)
+    if df is not None:
+        return df
+    if columns is not None and not as_text:
+        return read_sheet(book() if book else file_path, sheet_name, header=header, usecols=sorted(columns))
+
+    if as_text:
+        df = read_sheet_text(file_path, sheet_name, header)
+    else:
+        df = read_sheet(book() if book else file_path, sheet_name, header=header)
+    sidecar_cache.store(file_path, sheet_name, variant, df)
+    if columns is not None:
+        df = df.iloc[:, sorted(columns)]
+    return df
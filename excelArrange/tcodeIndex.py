@@ -0,0 +1,81 @@
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+from jobRunner import atomic_path
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+
+# ===== tantof.txt (DBeaver 匯出) 解析 =====
+def parse_mapping(path):
+    """解析 | 分隔的對照表，回傳 {TNAME: TCODE}
+
+    欄名與值去空白，「-----」分隔線列略過。
+    """
+    df = pd.read_csv(path, sep="|", header=0, dtype=str, keep_default_na=False)
+    df.columns = [str(c).strip() for c in df.columns]
+    if not {"TNAME", "TCODE"}.issubset(df.columns):
+        raise ValueError("對照表缺少必要欄位 TNAME 或 TCODE")
+
+    names = df["TNAME"].str.strip()
+    codes = df["TCODE"].str.strip()
+    dash = names.str.fullmatch(r"-+") | codes.str.fullmatch(r"-+")
+    return dict(zip(names[~dash], codes[~dash]))
+
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ===== 編譯後的索引檔 (與來源同目錄的 .idx) =====
+def _read_index(index_path):
+    try:
+        with open(index_path, "rb") as f:
+            index = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def _write_index(index_path, index):
+    """寫不進去 (例如唯讀資料夾) 時只是下次再解析，不影響使用"""
+    try:
+        with atomic_path(index_path) as tmp_path:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+
+
+def load_index(path):
+    """讀取對照表；索引檔與來源一致時直接載入，否則重新解析並更新索引
+
+    先比對 mtime / 大小，不同時再比對內容雜湊：
+    只是檔案被碰過 (內容相同) 就只更新索引的 mtime，不重新解析。
+    """
+    path = os.path.abspath(path)
+    index_path = path + INDEX_SUFFIX
+    st = os.stat(path)
+
+    index = _read_index(index_path)
+    if index and index["mtime"] == st.st_mtime and index["size"] == st.st_size:
+        return index["mapping"]
+
+    digest = file_hash(path)
+    if index and index["sha1"] == digest:
+        index.update(mtime=st.st_mtime, size=st.st_size)
+    else:
+        index = {"version": INDEX_VERSION, "sha1": digest, "mapping": parse_mapping(path)}
+        index.update(mtime=st.st_mtime, size=st.st_size)
+    _write_index(index_path, index)
+    return index["mapping"]
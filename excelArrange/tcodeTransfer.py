@@ -1,29 +1,30 @@
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import pandas as pd
 
-# 讀取對照表 (固定 ./data/tantof.txt)，並清掉分隔線那一列
+from jobRunner import JobRunner, atomic_path
+from fuzzyMatch import NgramIndex
+from readerBackend import sheet_names
+from runTimer import NULL_TIMER, start_timer
+from sidecarCache import read_cached
+from tcodeIndex import load_index
+from xlsxExport import open_workbook, write_sheet
+
+MAPPING_PATH = "./data/tantof.txt"
+
+# 讀取對照表 (固定 ./data/tantof.txt)；第一次使用時才載入，之後沿用
+# 在背景工作中呼叫 (第一次建索引可能很久)，失敗時丟出例外，由 JobRunner 顯示
 def load_mapping():
-    try:
-        mapping_df = pd.read_csv("./data/tantof.txt", sep="|", engine="python", header=0)
-        mapping_df = mapping_df.dropna(axis=1, how="all")                # 移除全空欄
-        mapping_df = mapping_df.rename(columns=lambda x: str(x).strip()) # 欄名去空白
-        # 去除「-----」分隔線列
-        for col in mapping_df.columns:
-            mapping_df[col] = mapping_df[col].astype(str).str.strip()
-        dash_row_mask = mapping_df.apply(lambda r: r.astype(str).str.fullmatch(r"-+").any(), axis=1)
-        mapping_df = mapping_df[~dash_row_mask].copy()
-
-        if not {"TNAME", "TCODE"}.issubset(mapping_df.columns):
-            raise ValueError("對照表缺少必要欄位 TNAME 或 TCODE")
-
-        # 建 TNAME → TCODE 對照
-        mapping_dict = dict(zip(mapping_df["TNAME"].astype(str).str.strip(),
-                                mapping_df["TCODE"].astype(str).str.strip()))
+    global mapping_dict
+    if mapping_dict is not None:
         return mapping_dict
+    try:
+        # 已編譯的索引檔 (tantof.txt.idx) 與來源一致時直接載入，來源更新才重建
+        mapping_dict = load_index(MAPPING_PATH)
     except Exception as e:
-        messagebox.showerror("錯誤", f"讀取對照表失敗: {e}")
-        return {}
+        raise ValueError(f"讀取對照表失敗: {e}") from e
+    return mapping_dict
 
 def make_unique(cols):
     """避免重複欄名：a, a -> a, a.1, a.2 ..."""
@@ -44,11 +45,22 @@ def make_unique(cols):
 # 全域狀態
 excel_file = None
 df = None
-mapping_dict = load_mapping()
+read_seconds = 0.0   # 載入工作表花費的時間 (執行報告用)
+mapping_dict = None  # 延後到輸出時才載入，視窗可立即開啟
+fuzzy_index = None   # 模糊比對用的 n-gram 索引，第一次需要時才建立
+
+def get_fuzzy_index(mapping):
+    global fuzzy_index
+    if fuzzy_index is None:
+        fuzzy_index = NgramIndex(mapping)
+    return fuzzy_index
 
 def choose_excel():
     """選擇 Excel 檔案，每次重置狀態，並自動載入第一個工作表"""
     global excel_file, df
+    if runner.busy:
+        messagebox.showwarning("提醒", "目前已有工作執行中")
+        return
     excel_file = filedialog.askopenfilename(
         filetypes=[("Excel files", "*.xlsx *.xls")]
     )
@@ -62,9 +74,9 @@ def choose_excel():
         col_combo.set("")
         col_combo["values"] = []
 
-        xl = pd.ExcelFile(excel_file)
-        sheet_combo["values"] = xl.sheet_names
-        if xl.sheet_names:
+        names = sheet_names(excel_file)
+        sheet_combo["values"] = names
+        if names:
             sheet_combo.current(0)
             # 自動載入第一個工作表
             load_sheet()
@@ -73,8 +85,26 @@ def choose_excel():
     except Exception as e:
         messagebox.showerror("錯誤", str(e))
 
+def read_sheet(path, sheet_name, as_text=False):
+    """讀取工作表，強制使用第一列作為欄位標頭 (欄名去空白、保證唯一)
+
+    as_text=True 時儲存格全部以文字讀取 (00123 不會變成 123，對應名稱不會因型別推斷而改變)。
+    """
+    raw = read_cached(path, sheet_name, as_text, header=None)
+    if raw.shape[0] == 0:
+        raise ValueError("此工作表沒有資料")
+
+    header = raw.iloc[0].astype(str).str.strip().tolist()
+    header = make_unique(header)              # 保障欄名唯一
+    sheet_df = raw.iloc[1:].reset_index(drop=True)  # 資料從第二列開始
+    sheet_df.columns = header
+    return sheet_df
+
 def load_sheet(event=None):
-    """讀取選定工作表，強制使用第一列作為欄位標頭"""
+    """在背景讀取選定工作表，強制使用第一列作為欄位標頭
+
+    read_excel 無法中途停止：讀取中按取消，會在讀完後才生效 (結果丟掉)。
+    """
     global df
     if not excel_file:
         messagebox.showerror("錯誤", "請先選擇 Excel 檔案")
@@ -83,26 +113,89 @@ def load_sheet(event=None):
     if not sheet_name:
         messagebox.showerror("錯誤", "請選擇工作表")
         return
-    try:
-        raw = pd.read_excel(excel_file, sheet_name=sheet_name, header=None)
-        if raw.shape[0] == 0:
-            messagebox.showerror("錯誤", "此工作表沒有資料")
-            return
+    path, as_text = excel_file, as_text_var.get()
 
-        header = raw.iloc[0].astype(str).str.strip().tolist()
-        header = make_unique(header)              # 保障欄名唯一
-        df = raw.iloc[1:].reset_index(drop=True)  # 資料從第二列開始
-        df.columns = header
+    def work(job):
+        t0 = time.perf_counter()
+        sheet_df = read_sheet(path, sheet_name, as_text)
+        job.check()  # 讀取中按了取消
+        return sheet_df, time.perf_counter() - t0
 
+    def done(result):
+        global df, read_seconds
+        df, read_seconds = result  # 讀取在輸出前就完成，執行報告另外記入
         col_combo["values"] = df.columns.tolist()
         if len(df.columns) > 0:
             col_combo.current(0)
         messagebox.showinfo("完成", f"已載入工作表：{sheet_name}\n(第一列已作為欄位標頭)")
-    except Exception as e:
-        messagebox.showerror("錯誤", f"載入工作表失敗：{e}")
+
+    if runner.busy:
+        messagebox.showwarning("提醒", "目前已有工作執行中")
+        return
+    df = None  # 讀完前 (或取消後) 不沿用先前工作表，避免與所選工作表不一致
+    runner.start(work, on_done=done, text=f"讀取工作表 {sheet_name}... (取消會在讀完後生效)")
+
+def transfer(src_df, sel_col, mapping, save_path, use_fuzzy=True, progress=None, timer=NULL_TIMER):
+    """以 sel_col 的值對應 TCODE 並寫出結果 Excel，回傳 (無對應筆數, 模糊比對有建議筆數)
+
+    progress(done, total, text)：不需要時可省略 (例如批次 / 效能測試)。
+    timer: 記錄 map / fuzzy / write 各階段時間。
+    """
+    progress = progress or (lambda done, total=None, text=None: None)
+    progress(0, 4, "對應 TCODE...")
+    # 以選定欄位的值去對應 TCODE
+    with timer.span("map", rows=len(src_df)):
+        temp_series = src_df[sel_col].astype(str).str.strip()
+        tcode_series = temp_series.map(mapping)
+
+    # 第二輪：只對無對應的列做模糊比對，建議結果另外放一張工作表
+    fuzzy_df = None
+    missing = tcode_series.isna()
+    if use_fuzzy and missing.any():
+        progress(1, 4, "模糊比對無對應名稱...")
+        with timer.span("fuzzy", rows=int(missing.sum())):
+            fuzzy_df = get_fuzzy_index(mapping).match(temp_series[missing])
+            fuzzy_df.insert(0, "原始值", temp_series[missing])
+            fuzzy_df.insert(0, "列號", fuzzy_df.index + 2)  # 對應 Result 工作表的列
+
+    # 不複製 src_df：TCODE 欄寫出時再併入，去除無對應的版本以列遮罩寫出
+    tcode_out = tcode_series.fillna("無對應")
+    has_code = (tcode_out != "無對應").to_numpy()
+    columns = list(src_df.columns)
+    tcode_col_idx = columns.index("TCODE") if "TCODE" in columns else len(columns)
+
+    def step(n, label):
+        return lambda done, total, text: progress(n, 4, f"寫出 {label}... {done}/{total}")
+
+    with timer.span("write", rows=len(src_df)), atomic_path(save_path) as tmp_path:
+        with open_workbook(tmp_path) as workbook:
+            # 原始輸出
+            worksheet, rows = write_sheet(workbook, "Result", src_df, extra={"TCODE": tcode_out},
+                                          progress=step(2, "Result"))
+            # 設定格式
+            red_format = workbook.add_format({"font_color": "red", "bold": True})
+            worksheet.conditional_format(
+                1, tcode_col_idx, rows, tcode_col_idx,
+                {
+                    "type": "cell",
+                    "criteria": "==",
+                    "value": '"無對應"',
+                    "format": red_format,
+                }
+            )
+            # 去除無對應的版本
+            write_sheet(workbook, "Result_NoMissing", src_df, rows=has_code, extra={"TCODE": tcode_out},
+                        progress=step(3, "Result_NoMissing"))
+            # 模糊比對建議 (需人工確認)
+            if fuzzy_df is not None:
+                write_sheet(workbook, "Fuzzy_Match", fuzzy_df)
+            progress(4, 4, "存檔中...")
+
+    suggested = 0 if fuzzy_df is None else (fuzzy_df["建議TCODE"] != "").sum()
+    return int((~has_code).sum()), suggested
 
 def export_file():
-    global df, mapping_dict
+    global df
     if df is None:
         messagebox.showerror("錯誤", "請先選擇並載入工作表")
         return
@@ -112,76 +205,70 @@ def export_file():
         messagebox.showerror("錯誤", "請選擇對應欄位")
         return
 
-    if not mapping_dict:
-        messagebox.showerror("錯誤", "對照表讀取失敗，無法對應")
-        return
-
-    # 以選定欄位的值去對應 TCODE
-    temp_series = df[sel_col].astype(str).str.strip()
-    tcode_series = temp_series.map(mapping_dict)
-
-    out_df = df.copy()
-    out_df["TCODE"] = tcode_series.fillna("無對應")
-
-    # 去除「無對應」的版本
-    no_missing_df = out_df[out_df["TCODE"] != "無對應"].copy()
-
     save_path = filedialog.asksaveasfilename(
         defaultextension=".xlsx",
         filetypes=[("Excel files", "*.xlsx")],
         title="另存新檔"
     )
-    if save_path:
-        try:
-            with pd.ExcelWriter(save_path, engine="xlsxwriter") as writer:
-                # 原始輸出
-                out_df.to_excel(writer, index=False, sheet_name="Result")
-                # 去除無對應的版本
-                no_missing_df.to_excel(writer, index=False, sheet_name="Result_NoMissing")
+    if not save_path:
+        return
 
-                # 設定格式
-                workbook  = writer.book
-                worksheet = writer.sheets["Result"]
+    src_df = df
+    use_fuzzy = fuzzy_var.get()
+    timer = start_timer("tcodeTransfer")
+    timer.add("read", read_seconds, len(src_df))
 
-                red_format = workbook.add_format({"font_color": "red", "bold": True})
+    def work(job):
+        # 對照表第一次使用時才載入 / 建索引，同樣在背景進行
+        job.progress(0, None, "讀取對照表...")
+        mapping = load_mapping()
+        if not mapping:
+            raise ValueError("對照表沒有資料，無法對應")
+        return transfer(src_df, sel_col, mapping, save_path, use_fuzzy, progress=job.progress, timer=timer)
 
-                tcode_col_idx = out_df.columns.get_loc("TCODE")
+    def done(result):
+        missing_count, suggested = result
+        summary = timer.finish(save_path, len(src_df), peak_rss=runner.peak_rss,
+                               missing=missing_count, suggested=int(suggested))
+        if summary:
+            runner.set_status(summary)
+        msg = f"已產生新檔案：\n{save_path}\n\n⚠️ 無對應筆數：{missing_count}"
+        if use_fuzzy:
+            msg += f"\n模糊比對有建議：{suggested} 筆 (見 Fuzzy_Match 工作表)"
+        messagebox.showinfo("完成", msg)
 
-                worksheet.conditional_format(
-                    1, tcode_col_idx, len(out_df), tcode_col_idx,
-                    {
-                        "type": "cell",
-                        "criteria": "==",
-                        "value": '"無對應"',
-                        "format": red_format,
-                    }
-                )
+    runner.start(work, on_done=done)
 
-            missing_count = (out_df["TCODE"] == "無對應").sum()
-            messagebox.showinfo("完成", f"已產生新檔案：\n{save_path}\n\n⚠️ 無對應筆數：{missing_count}")
+if __name__ == "__main__":
+    # 介面
+    root = tk.Tk()
+    root.title("Excel 對應轉換工具")
+    root.geometry("430x395")
 
-        except Exception as e:
-            messagebox.showerror("錯誤", f"儲存失敗：{e}")
+    frm = ttk.Frame(root, padding=10)
+    frm.pack(fill="both", expand=True)
 
-# 介面
-root = tk.Tk()
-root.title("Excel 對應轉換工具")
-root.geometry("430x300")
+    ttk.Button(frm, text="選擇 Excel 檔案", command=choose_excel).pack(pady=8)
 
-frm = ttk.Frame(root, padding=10)
-frm.pack(fill="both", expand=True)
+    ttk.Label(frm, text="選擇工作表").pack()
+    sheet_combo = ttk.Combobox(frm, state="readonly")
+    sheet_combo.pack(pady=5, fill="x")
+    sheet_combo.bind("<<ComboboxSelected>>", load_sheet)
 
-ttk.Button(frm, text="選擇 Excel 檔案", command=choose_excel).pack(pady=8)
+    ttk.Label(frm, text="選擇對應欄位（將用此欄的值對應到 TCODE）").pack()
+    col_combo = ttk.Combobox(frm, state="readonly")
+    col_combo.pack(pady=5, fill="x")
 
-ttk.Label(frm, text="選擇工作表").pack()
-sheet_combo = ttk.Combobox(frm, state="readonly")
-sheet_combo.pack(pady=5, fill="x")
-sheet_combo.bind("<<ComboboxSelected>>", load_sheet)
+    fuzzy_var = tk.BooleanVar(value=True)
+    ttk.Checkbutton(frm, text="無對應的名稱做模糊比對（建議另列工作表）", variable=fuzzy_var).pack(pady=(8, 0))
+    as_text_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(frm, text="以文字讀取（保留 00123 這類代碼，切換後請重新選工作表）",
+                    variable=as_text_var).pack()
 
-ttk.Label(frm, text="選擇對應欄位（將用此欄的值對應到 TCODE）").pack()
-col_combo = ttk.Combobox(frm, state="readonly")
-col_combo.pack(pady=5, fill="x")
+    ttk.Button(frm, text="輸出 Excel", command=export_file).pack(pady=12)
 
-ttk.Button(frm, text="輸出 Excel", command=export_file).pack(pady=18)
+    # 背景工作進度 / 取消
+    runner = JobRunner(root, frm)
+    runner.frame.pack(fill="x")
 
-root.mainloop()
+    root.mainloop()
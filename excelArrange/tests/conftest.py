@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+# 測試時不使用磁碟快取 (不寫到使用者的快取目錄)；各模組以同層方式匯入
+os.environ["SIDECAR_CACHE"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fdfSchema import TYPE_NUMBER, TYPE_TEXT, parse_fdf  # noqa: E402
+
+
+def fdf_text(fields):
+    """[(名稱, 長度, 型別), ...] -> FDF 文字內容"""
+    lines = ["[Data Transfer File Description]", f"FieldCount={len(fields)}"]
+    for i, (name, length, kind) in enumerate(fields, 1):
+        lines += [f"[F{i:04d}]", f"Length={length}", f"Name={name}", f"Type={kind}"]
+    return "\n".join(lines)
+
+
+def make_layout(fields):
+    """[(名稱, 長度, 型別), ...] -> FdfLayout"""
+    return parse_fdf(fdf_text(fields))
+
+
+@pytest.fixture
+def layout():
+    return make_layout([("CODE", 8, TYPE_NUMBER), ("NAME", 6, TYPE_TEXT), ("QTY", 3, TYPE_NUMBER)])
@@ -0,0 +1,23 @@
+import os
+
+import pandas as pd
+
+from batchConvert import main, output_paths
+
+
+def test_output_paths_unique():
+    files = ["a/x.xlsx", "b/x.xlsx", "c/X.xls", "x_1.xlsx", "y.xlsx"]
+    paths = output_paths(files, "out")
+    assert [os.path.basename(paths[f]) for f in files] == ["x.txt", "x_2.txt", "X_3.txt", "x_1.txt", "y.txt"]
+
+
+def test_same_name_in_different_folders(tmp_path, capsys):
+    for folder, code in (("a", "111"), ("b", "222")):
+        (tmp_path / folder).mkdir()
+        pd.DataFrame({"代碼": [code]}).to_excel(tmp_path / folder / "x.xlsx", index=False)
+    out_dir = tmp_path / "out"
+    inputs = [str(tmp_path / "a" / "x.xlsx"), str(tmp_path / "b" / "x.xlsx")]
+    assert main(inputs + ["--out-dir", str(out_dir), "--workers", "1"]) == 0
+    assert sorted(os.listdir(out_dir)) == ["x.txt", "x_1.txt"]
+    assert (out_dir / "x.txt").read_text().split() == ["111"]
+    assert (out_dir / "x_1.txt").read_text().split() == ["222"]
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from deltaExport import compare, hash_values
+
+SIGNATURE = ("concat",)
+
+
+def _manifest(keys, records, signature=SIGNATURE):
+    keys = hash_values(pd.Series(keys, dtype=object))
+    last = ~pd.Index(keys).duplicated(keep="last")  # 同 save_manifest
+    return {"signature": signature, "keys": keys[last],
+            "hashes": hash_values(pd.Series(records, dtype=object))[last]}
+
+
+def _compare(prev, keys, records, signature=SIGNATURE):
+    return compare(prev, hash_values(pd.Series(keys, dtype=object)),
+                   hash_values(pd.Series(records, dtype=object)), signature)
+
+
+def test_no_manifest_all_inserted():
+    inserted, changed, deleted = _compare(None, ["a", "b"], ["a1", "b1"])
+    assert inserted.tolist() == [True, True]
+    assert changed.tolist() == [False, False]
+    assert len(deleted) == 0
+
+
+def test_empty_manifest_all_inserted():
+    inserted, changed, deleted = _compare(_manifest([], []), ["a", "b"], ["a1", "b1"])
+    assert inserted.tolist() == [True, True]
+    assert changed.tolist() == [False, False]
+    assert len(deleted) == 0
+
+
+def test_empty_current_run_deletes_everything():
+    inserted, changed, deleted = _compare(_manifest(["a", "b"], ["a1", "b1"]), [], [])
+    assert len(inserted) == 0 and len(changed) == 0
+    assert deleted.tolist() == [True, True]
+
+
+def test_changed_inserted_deleted():
+    prev = _manifest(["a", "b", "c"], ["a1", "b1", "c1"])
+    inserted, changed, deleted = _compare(prev, ["a", "b", "d"], ["a1", "b2", "d1"])
+    assert inserted.tolist() == [False, False, True]
+    assert changed.tolist() == [False, True, False]
+    assert deleted.tolist() == [False, False, True]
+
+
+def test_duplicate_keys_compare_against_last_occurrence():
+    prev = _manifest(["a", "a", "b"], ["old", "a1", "b1"])
+    assert len(prev["keys"]) == 2
+    inserted, changed, deleted = _compare(prev, ["a", "a", "b"], ["a1", "a2", "b1"])
+    assert inserted.tolist() == [False, False, False]
+    assert changed.tolist() == [False, True, False]
+    assert not deleted.any()
+
+
+def test_signature_change_marks_existing_rows_changed():
+    prev = _manifest(["a", "b"], ["a1", "b1"], signature=("fdf",))
+    inserted, changed, _ = _compare(prev, ["a", "c"], ["a1", "c1"])
+    assert inserted.tolist() == [False, True]
+    assert changed.tolist() == [True, False]
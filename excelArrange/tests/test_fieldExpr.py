@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from fieldExpr import ARITY, FUNCS, ExprError, compile_expr
+
+
+def _eval(text, **columns):
+    expr = compile_expr(text)
+    source = {k: pd.Series(v, dtype=object) for k, v in columns.items()}
+    return list(expr.evaluate(source, len(next(iter(source.values())))))
+
+
+def test_functions_and_columns():
+    assert _eval('pad(left([代碼], 3), 5) & "-" & [名稱]', 代碼=["12345", "9"], 名稱=["甲", "乙"]) == \
+        ["00123-甲", "00009-乙"]
+    assert _eval('iif(num([數量]) > 0, "Y", "N")', 數量=["3", "0"]) == ["Y", "N"]
+
+
+def test_every_function_has_arity():
+    assert set(ARITY) == set(FUNCS)
+
+
+@pytest.mark.parametrize("text", ["[a] & __col1", "__col0", "__colx", "__col"])
+def test_raw_column_names_rejected(text):
+    # 使用者直接打 __colN 時不可引用到不存在的欄位 (原本執行時才 IndexError)
+    with pytest.raises(ExprError, match="不認得的名稱"):
+        compile_expr(text)
+
+
+@pytest.mark.parametrize("text", ["left([a])", "mid([a], 1, 2, 3)", "iif([a], 1)", "concat()", "lookup([a], 'x')"])
+def test_wrong_argument_count(text):
+    with pytest.raises(ExprError, match="參數個數"):
+        compile_expr(text)
+
+
+@pytest.mark.parametrize("text", ["pad([a], 3)", "pad([a], 3, ' ')", "round([a])", "concat([a], [b], 'x')"])
+def test_optional_arguments_accepted(text):
+    compile_expr(text)
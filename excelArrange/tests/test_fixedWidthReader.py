@@ -0,0 +1,49 @@
+import pandas as pd
+
+from conftest import fdf_text, make_layout
+from fdfSchema import TYPE_NUMBER, TYPE_TEXT
+from fixedWidthReader import read_fixed_width
+from recordBuffer import write_records
+
+FIELDS = [("CODE", 6, TYPE_NUMBER), ("NAME", 6, TYPE_TEXT), ("NOTE", 4, 3), ("QTY", 3, TYPE_NUMBER)]
+
+
+def _fdf(tmp_path, fields):
+    path = tmp_path / "layout.fdf"
+    path.write_text(fdf_text(fields), encoding="utf-8")
+    return str(path)
+
+
+def test_round_trip_from_record_buffer(tmp_path):
+    # Type 1 / 2 / 其他型別，含空白、雙位元組字補齊與截斷
+    df = pd.DataFrame({
+        "CODE": ["123", "000045", "1.5", "", "7"],
+        "NAME": ["中文", "", "abc", "中文字x", "  a"],
+        "NOTE": ["x", "", "長", "abcd", "e"],
+        "QTY": ["1", "22", "333", "", "5"],
+    }, dtype=object)
+    path = tmp_path / "out.txt"
+    write_records(str(path), [df], make_layout(FIELDS), "cp950")
+
+    back = read_fixed_width(str(path), _fdf(tmp_path, FIELDS), "cp950")
+    assert list(back.columns) == ["CODE", "NAME", "NOTE", "QTY"]
+    assert list(back["CODE"]) == [123, 45, 1.5, 0, 7]
+    assert [type(v) for v in back["CODE"]] == [int, int, float, int, int]
+    assert list(back["NAME"]) == ["中文", "", "abc", "中文字", "  a"]
+    assert list(back["NOTE"]) == ["x", "", "長", "abcd", "e"]
+    assert back["QTY"].dtype == "int64"
+    assert list(back["QTY"]) == [1, 22, 333, 0, 5]
+
+
+def test_blank_or_decimal_does_not_turn_integers_into_floats(tmp_path):
+    fields = [("AMT", 20, TYPE_NUMBER), ("ID", 3, TYPE_NUMBER)]
+    path = tmp_path / "data.txt"
+    path.write_bytes(b"00012345678901234567  1\r\n"
+                     b"                    012\r\n"
+                     b"000000000000000001.5 -3\r\n")
+    back = read_fixed_width(str(path), _fdf(tmp_path, fields))
+    assert back["AMT"][0] == 12345678901234567 and isinstance(back["AMT"][0], int)
+    assert pd.isna(back["AMT"][1])
+    assert back["AMT"][2] == 1.5
+    assert back["ID"].dtype == "int64"
+    assert list(back["ID"]) == [1, 12, -3]
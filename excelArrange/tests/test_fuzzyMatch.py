@@ -0,0 +1,46 @@
+import pytest
+
+import fuzzyMatch
+from fuzzyMatch import NgramIndex
+
+
+@pytest.fixture
+def index():
+    return NgramIndex({"台北市政府": "A01", "新北市政府": "A02", "ＡＢＣ 公司": "B01"})
+
+
+def test_exact_after_normalize_scores_one(index):
+    assert index.best("abc公司") == (2, 1.0)
+
+
+def test_dice_score_picks_best(index):
+    # 台北市府：{台北, 北市, 市府}，與台北市政府共有 2 個 -> 2*2 / (3+4)
+    i, score = index.best("台北市府")
+    assert index.names[i] == "台北市政府"
+    assert score == pytest.approx(4 / 7)
+
+
+def test_empty_and_no_match(index):
+    assert index.best("") == (None, 0.0)
+    assert index.best("xyz") == (None, 0.0)
+    df = index.match(["xyz", "台北市府", "xyz"], min_score=0.6)
+    assert list(df["建議TCODE"]) == ["", "", ""]
+    assert list(df["分數"]) == [0.0, round(4 / 7, 3), 0.0]
+
+
+def test_common_ngrams_do_not_find_candidates():
+    mapping = {"xx": 1, "axx": 2, "bxx": 3, "Kxz": 4}
+    # 「xx」出現在 3 個名稱：上限 2 時只由「kx」找候選
+    i, score = NgramIndex(mapping, max_df=2).best("Kxx")
+    assert (i, score) == (3, 0.5)
+    i, score = NgramIndex(mapping).best("Kxx")
+    assert (i, score) == (0, pytest.approx(2 / 3))
+
+
+@pytest.mark.parametrize("top_k", [1, 2, 20])
+def test_top_k_keeps_best_candidate(monkeypatch, top_k):
+    monkeypatch.setattr(fuzzyMatch, "TOP_K", top_k)
+    index = NgramIndex({"abxxxx": 1, "xbcxxx": 2, "abcdez": 3, "xxcdxx": 4, "xxxdef": 5})
+    i, score = index.best("abcdef")
+    assert index.codes[i] == 3
+    assert score == pytest.approx(0.8)
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from conftest import make_layout
+from fdfSchema import TYPE_NUMBER, TYPE_TEXT
+from parallelExport import export_text_parallel
+from textExport import export_text
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"代碼": ["001", "002", None, "004"], "名稱": ["甲", "乙乙乙乙", "丙", None],
+                      "數量": [1, 2.5, 3, 72.0]}).to_excel(writer, sheet_name="S1", index=False)
+        pd.DataFrame({"代碼": ["101"], "名稱": ["a\nb"], "數量": [-1]}).to_excel(writer, sheet_name="S2", index=False)
+        pd.DataFrame({"代碼": [], "名稱": [], "數量": []}).to_excel(writer, sheet_name="空白", index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("as_text", [False, True])
+@pytest.mark.parametrize("fdf", [False, True])
+def test_output_is_byte_identical_to_serial(book, tmp_path, fdf, as_text):
+    layout = make_layout([("CODE", 4, TYPE_NUMBER), ("NAME", 6, TYPE_TEXT), ("QTY", 5, TYPE_NUMBER)]) if fdf else None
+    selections = [("S1", [0, 1, 2]), ("空白", [0, 1]), ("S2", [2, 0, 1]), ("S1", [])]
+    serial, parallel = tmp_path / "serial.txt", tmp_path / "parallel.txt"
+    count = export_text(book, selections, str(serial), layout, as_text=as_text)
+    assert export_text_parallel(book, selections, str(parallel), layout, as_text=as_text) == count
+    assert count > 0
+    assert parallel.read_bytes() == serial.read_bytes()
@@ -0,0 +1,46 @@
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from pipelineRunner import parse_spec, run_pipeline
+
+
+@pytest.fixture
+def source(tmp_path):
+    """2 筆資料；D4 有規格沒用到的值、B6 只有格式 (openpyxl read-only 會讀出到第 6 列)"""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["代碼", "擔當者"])
+    ws.append(["001", "王小明"])
+    ws.append(["002", "李小華"])
+    ws["D4"] = "備註"
+    ws["B6"].font = Font(bold=True)
+    path = tmp_path / "src.xlsx"
+    wb.save(path)
+    mapping = tmp_path / "tantof.txt"
+    mapping.write_text("TNAME|TCODE\n王小明|A01\n李小華|B02\n", encoding="utf-8")
+    return tmp_path
+
+
+def _run(base, fields, missing="keep"):
+    spec = parse_spec({
+        "source": {"file": "src.xlsx"},
+        "fields": fields,
+        "mapping": {"file": "tantof.txt", "missing": missing},
+        "output": "out.txt",
+    }, str(base))
+    result = run_pipeline(spec)
+    return result, (base / "out.txt").read_bytes().decode("cp950").splitlines()
+
+
+@pytest.mark.parametrize("missing", ["keep", "error", "skip"])
+def test_trailing_formatted_rows_are_ignored(source, missing):
+    result, lines = _run(source, [{"name": "K", "column": "代碼"}, {"name": "T", "tcode": "擔當者"}], missing)
+    assert (result.rows_in, result.rows_out, result.unmatched) == (2, 2, 0)
+    assert lines == ["001A01", "002B02"]
+
+
+def test_fixed_values_only_follow_source_rows(source):
+    result, lines = _run(source, [{"name": "X", "value": "Z"}])
+    assert result.rows_out == 2
+    assert lines == ["Z", "Z"]
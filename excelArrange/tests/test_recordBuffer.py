@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from conftest import make_layout
+from fdfEncoder import encode_frame_loop
+from fdfSchema import TYPE_NUMBER, TYPE_TEXT
+from recordBuffer import encode_records, write_records
+
+
+def _records(df, layout, encoding="cp950"):
+    return [bytes(r) for r in encode_records(df, layout, encoding)]
+
+
+def test_ascii_matches_loop(layout):
+    # 含過長 (截斷)、剛好、過短 (補齊) 與數值欄
+    df = pd.DataFrame({
+        "CODE": [123, 123456789, 0],
+        "NAME": ["ab", "abcdefghij", "abcdef"],
+        "QTY": [1.5, 7, 12345],
+    })
+    expected = [line.encode("cp950") for line in encode_frame_loop(df, layout)]
+    assert _records(df, layout) == expected
+
+
+def test_dbcs_counts_bytes_and_keeps_characters_whole():
+    layout = make_layout([("NAME", 5, TYPE_TEXT), ("CODE", 4, TYPE_NUMBER)])
+    df = pd.DataFrame({"NAME": ["中文", "中文字", "a中文字", "ab"], "CODE": ["1", "12", "甲", "12345"]})
+    assert _records(df, layout) == [
+        "中文 0001".encode("cp950"),
+        "中文 0012".encode("cp950"),   # 「字」放不下整個字，不切半
+        "a中文00甲".encode("cp950"),
+        "ab   1234".encode("cp950"),
+    ]
+    # 每筆都是固定位元組長度
+    assert {len(r) for r in _records(df, layout)} == {layout.record_length}
+
+
+def test_unencodable_character_is_reported(layout):
+    df = pd.DataFrame({"CODE": [1, 2], "NAME": ["ok", "x😀y"], "QTY": [1, 2]})
+    with pytest.raises(ValueError, match=r"第 2 筆的欄位 NAME：「😀」無法以 cp950 編碼"):
+        encode_records(df, layout, "cp950")
+
+
+def test_write_records_reports_position_across_frames(tmp_path, layout):
+    frames = [pd.DataFrame({"CODE": [1, 2], "NAME": ["a", "b"], "QTY": [1, 2]}),
+              pd.DataFrame({"CODE": [3], "NAME": ["한"], "QTY": [3]})]
+    path = tmp_path / "out.txt"
+    with pytest.raises(ValueError, match="第 3 筆的欄位 NAME"):
+        write_records(str(path), frames, layout, "cp950", chunk_rows=1)
+    assert not path.exists()
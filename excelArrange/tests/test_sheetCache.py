@@ -0,0 +1,25 @@
+import os
+
+import pandas as pd
+import pytest
+
+from sheetCache import SheetCache
+
+
+def _write(path, values, mtime):
+    pd.DataFrame({"代碼": values}).to_excel(path, sheet_name="S1", index=False)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.parametrize("as_text", [False, True])
+def test_rewritten_file_drops_old_entries(tmp_path, as_text):
+    path = str(tmp_path / "book.xlsx")
+    cache = SheetCache()
+    _write(path, ["a", "b"], 1_000_000)
+    assert list(cache.get(path, "S1", as_text)["代碼"]) == ["a", "b"]
+    assert cache.get(path, "S1", as_text) is cache.get(path, "S1", as_text)
+
+    _write(path, ["c"], 2_000_000)
+    assert list(cache.get(path, "S1", as_text)["代碼"]) == ["c"]
+    assert {key[1] for key in cache._sheets} == {2_000_000}
+    assert cache.total_bytes == sum(nbytes for _, nbytes in cache._sheets.values())
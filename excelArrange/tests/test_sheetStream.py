@@ -0,0 +1,49 @@
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from sheetCache import shared_cache
+from sheetStream import stream_concat, stream_records
+from textExport import export_text
+
+
+def _workbook(path, rows, styled_cells=()):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    for row in rows:
+        ws.append(row)
+    for ref in styled_cells:
+        ws[ref].font = Font(bold=True)  # 只有格式、沒有值的儲存格
+    wb.save(path)
+    return str(path)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_stream_records_matches_export_text(tmp_path, layout):
+    path = _workbook(tmp_path / "in.xlsx", [
+        ("CODE", "NAME", "QTY"),
+        ("00123", "甲", 3.0),
+        (None, None, None),  # 中間的空白列照樣輸出
+        (456, "ab", 2),
+        (789, "x", 1.5),
+    ], styled_cells=["A8", "C12"])
+    selections = [("Data", [0, 1, 2])]
+
+    shared_cache.clear()
+    assert export_text(path, selections, str(tmp_path / "full.txt"), layout, as_text=True) == 4
+    assert stream_records(path, selections, str(tmp_path / "stream.txt"), layout) == 4
+    assert _read(tmp_path / "stream.txt") == _read(tmp_path / "full.txt")
+
+
+def test_stream_concat_ignores_trailing_formatted_rows(tmp_path):
+    path = _workbook(tmp_path / "in.xlsx", [("A", "B"), ("x", 1), ("y", 2)], styled_cells=["B9"])
+    selections = [("Data", [0, 1])]
+
+    shared_cache.clear()
+    assert export_text(path, selections, str(tmp_path / "full.txt"), as_text=True) == 2
+    assert stream_concat(path, selections, str(tmp_path / "stream.txt")) == 2
+    assert _read(tmp_path / "stream.txt") == _read(tmp_path / "full.txt")
@@ -0,0 +1,77 @@
+import os
+
+import pandas as pd
+import pytest
+
+import sidecarCache
+from readerBackend import read_sheet
+from sidecarCache import SidecarCache, read_cached
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / "book.xlsx"
+    df = pd.DataFrame({"代碼": ["001", "002", "003"], "名稱": ["甲", "乙", "丙"], "數量": [1, 2.5, 3]})
+    df.to_excel(path, sheet_name="S1", index=False)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = SidecarCache(str(tmp_path / "cache"), enabled=True)
+    monkeypatch.setattr(sidecarCache, "sidecar_cache", cache)
+    return cache
+
+
+def _entries(cache):
+    return os.listdir(cache.directory) if os.path.isdir(cache.directory) else []
+
+
+def test_column_read_on_miss_uses_usecols_and_stores_nothing(book, cache):
+    df = read_cached(book, "S1", columns=[2, 0])
+    pd.testing.assert_frame_equal(df, read_sheet(book, "S1", usecols=[0, 2]))
+    assert _entries(cache) == []
+
+
+def test_full_read_stores_and_column_read_hits(book, cache):
+    full = read_cached(book, "S1")
+    assert len(_entries(cache)) == 1
+    pd.testing.assert_frame_equal(read_cached(book, "S1"), full)
+    pd.testing.assert_frame_equal(read_cached(book, "S1", columns=[1, 2]), full.iloc[:, [1, 2]])
+
+
+def test_text_read_with_columns_still_stores(book, cache):
+    df = read_cached(book, "S1", as_text=True, columns=[0])
+    assert list(df.iloc[:, 0]) == ["001", "002", "003"]
+    assert len(_entries(cache)) == 1
+
+
+def test_mixed_column_round_trips_without_pickle(book, cache):
+    df = pd.DataFrame({1: ["a", 2, 2.5, None, float("nan"), pd.Timestamp("2024-01-31"), True],
+                       "數量": range(7)})
+    assert cache.store(book, "S1", "value", df)
+    loaded = cache.load(book, "S1", "value")
+    assert list(loaded.columns) == [1, "數量"]
+    assert [type(v) for v in loaded[1]] == [type(v) for v in df[1]]
+    pd.testing.assert_frame_equal(loaded, df)
+
+
+def test_unsupported_cell_type_is_not_cached(book, cache):
+    df = pd.DataFrame({"A": ["a", 1, object()]})
+    assert not cache.store(book, "S1", "value", df)
+    assert cache.load(book, "S1", "value") is None
+
+
+def test_engine_change_does_not_reuse_cache(book, cache, monkeypatch):
+    import readerBackend
+
+    monkeypatch.setattr(readerBackend, "forced_engine", "openpyxl")
+    read_cached(book, "S1")
+    assert len(_entries(cache)) == 1
+    monkeypatch.setattr(readerBackend, "forced_engine", "calamine")
+    if not readerBackend.engine_installed("calamine"):
+        pytest.skip("未安裝 python-calamine")
+    read_cached(book, "S1")
+    assert len(_entries(cache)) == 2
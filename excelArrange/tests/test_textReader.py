@@ -0,0 +1,45 @@
+import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import readerBackend
+from textReader import read_sheet_text
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = tmp_path / "book.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "S1"
+    ws.append(["代碼", "名稱", "數量", "日期", None, "代碼"])
+    ws.append(["00123", "甲", 72, datetime.datetime(2024, 1, 31), None, 1.5])
+    ws.append([None, None, None, None, None, None])  # 中間的空白列
+    ws.append(["007", "", 3.0, datetime.date(2023, 12, 1), "x", -2])
+    ws.append(["", "乙", 1e20, None, None, 0.1])
+    ws["A1"].number_format = "@"
+    ws.cell(8, 2).number_format = "0.00"  # 結尾只有格式的空白儲存格
+    wb.save(path)
+    return str(path)
+
+
+@pytest.fixture(params=["openpyxl", "calamine"])
+def engine(request, monkeypatch):
+    if not readerBackend.engine_installed(request.param):
+        pytest.skip(f"未安裝 {request.param}")
+    monkeypatch.setattr(readerBackend, "forced_engine", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("header", [0, None])
+def test_matches_read_excel_dtype_str(book, engine, header):
+    expected = pd.read_excel(book, sheet_name="S1", header=header, dtype=str, engine="openpyxl").astype(object)
+    pd.testing.assert_frame_equal(read_sheet_text(book, "S1", header), expected)
+
+
+def test_keeps_codes_as_text(book, engine):
+    df = read_sheet_text(book, "S1")
+    assert list(df["代碼"][:4].fillna("-")) == ["00123", "-", "007", "-"]
+    assert df["數量"][0] == "72"
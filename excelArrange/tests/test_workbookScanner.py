@@ -0,0 +1,33 @@
+import re
+import zipfile
+
+import pandas as pd
+
+from readerBackend import sheet_headers
+from workbookScanner import scan_headers
+
+
+def _strip_cell_refs(src, dst):
+    """拿掉所有 <c r="..."> 的 r 屬性 (有些程式產生的 xlsx 會這樣寫)"""
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w") as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename.startswith("xl/worksheets/"):
+                data = re.sub(rb'(<c\b[^>]*?) r="[A-Z]+\d+"', rb"\1", data)
+            zout.writestr(item, data)
+
+
+def test_headers_match_pandas(tmp_path):
+    path = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"代碼": [1], "名稱": ["甲"], "代碼 ": [2]}).to_excel(writer, sheet_name="S1", index=False)
+        pd.DataFrame([[1, 2, 3]], columns=["a", "a", 7]).to_excel(writer, sheet_name="S2", index=False)
+    assert scan_headers(str(path)) == sheet_headers(str(path))
+
+
+def test_cells_without_reference(tmp_path):
+    src, dst = tmp_path / "src.xlsx", tmp_path / "noref.xlsx"
+    pd.DataFrame({"代碼": ["001"], "名稱": ["甲"], "數量": [3]}).to_excel(src, sheet_name="S1", index=False)
+    _strip_cell_refs(src, dst)
+    assert b' r="A1"' not in zipfile.ZipFile(dst).read("xl/worksheets/sheet1.xml")
+    assert scan_headers(str(dst)) == {"S1": ["代碼", "名稱", "數量"]}
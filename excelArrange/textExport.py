@@ -0,0 +1,73 @@
+from fdfEncoder import encode_frame, write_lines
+from jobRunner import atomic_path
+from recordBuffer import DEFAULT_ENCODING, write_records
+from runTimer import NULL_TIMER
+from sheetCache import shared_cache
+
+CHUNK_ROWS = 50000  # 每格式化這麼多列回報一次進度
+
+
+# ===== 工作表 -> 文字列 (GUI、批次、平行處理共用) =====
+def prepare_frame(df, col_indexes, fdf_layout=None):
+    """取勾選欄位並處理空值 (須對整張表做，之後才能切塊格式化)
+
+    data2txt：含空值的列略過；data2txtWithFDF：空值補空字串。
+    """
+    if fdf_layout:
+        return df.iloc[:, col_indexes].fillna("")
+    return df.iloc[:, col_indexes].dropna()
+
+
+def format_frame(df_filtered, fdf_layout=None):
+    """已處理過的資料逐列轉成文字 (回傳 Series)，可對任意列區塊呼叫"""
+    if fdf_layout:
+        return encode_frame(df_filtered, fdf_layout)
+    return df_filtered.fillna("").astype(str).agg("".join, axis=1)
+
+
+def export_text(file_path, selections, save_path, fdf_layout=None, progress=None,
+                chunk_rows=CHUNK_ROWS, encoding=DEFAULT_ENCODING, timer=NULL_TIMER, as_text=False):
+    """逐張讀取、分塊格式化後寫出，回傳輸出筆數 (0 筆時不產生檔案)
+
+    selections: [(sheet_name, [欄位 index, ...]), ...]
+    有 FDF 時以 encoding 編碼、依位元組補齊成定長記錄 (recordBuffer)。
+    progress(done, total, text)：每處理完一個區塊呼叫一次。
+    timer: runTimer.RunTimer，記錄 read / filter / format / write 各階段時間。
+    as_text: 以文字讀取 (textReader)，保留 00123 這類代碼、不經 float 轉換。
+    """
+    frames = []
+    for n, (sheet_name, col_indexes) in enumerate(selections, 1):
+        if not col_indexes:
+            continue
+        if progress:
+            progress(0, None, f"工作表 {n}/{len(selections)} {sheet_name} 讀取中...")
+        with timer.span("read") as span:
+            df = shared_cache.get(file_path, sheet_name, as_text)
+            span.rows = len(df)
+        with timer.span("filter") as span:
+            frames.append(prepare_frame(df, col_indexes, fdf_layout))
+            span.rows = len(frames[-1])
+
+    count = sum(len(df) for df in frames)
+    if count == 0:
+        return 0
+
+    with atomic_path(save_path) as tmp_path:
+        if fdf_layout:
+            write_records(tmp_path, frames, fdf_layout, encoding, progress=progress, chunk_rows=chunk_rows,
+                          timer=timer)
+            return count
+
+        chunks = []
+        done = 0
+        for df_filtered in frames:
+            for start in range(0, len(df_filtered), chunk_rows):
+                with timer.span("format") as span:
+                    chunks.append(format_frame(df_filtered.iloc[start:start + chunk_rows]))
+                    span.rows = len(chunks[-1])
+                done += len(chunks[-1])
+                if progress:
+                    progress(done, count, f"已處理 {done}/{count} 筆")
+        with timer.span("write", rows=count):
+            write_lines(tmp_path, chunks)
+    return count
@@ -0,0 +1,14 @@
+from readerBackend import read_sheet
+
+# ===== 以文字讀取工作表 (read_excel 的 dtype=str，不推斷型別) =====
+# 儲存格一律轉成字串：文字原樣保留 (00123 不會變成 123)，數字同 read_excel 後 str()
+# (1057.0 -> "1057")，日期為 "YYYY-MM-DD HH:MM:SS"；空白與 NA 文字為 NaN。
+# 讀取速度取決於 readerBackend 選的引擎 (有 calamine 時快數倍)。
+
+
+def read_sheet_text(file_path, sheet_name, header=0):
+    """以文字讀取整張工作表，回傳全為字串 (空值為 NaN) 的 DataFrame
+
+    header=0：第一列為欄名 (命名規則同 pd.read_excel)；header=None：欄名為 0, 1, 2 ...。
+    """
+    return read_sheet(file_path, sheet_name, header=header, dtype=str).astype(object)
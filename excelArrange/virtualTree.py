@@ -0,0 +1,105 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+# ===== 虛擬化預覽表格 (Treeview 只放畫面看得到的列) =====
+class VirtualTreeview(tk.Frame):
+    """預覽 DataFrame 用的表格，捲動時才取出可視範圍的資料
+
+    不論資料有幾列，Treeview 內只保留「畫面高度」那麼多個項目，
+    捲動時直接改寫這些項目的內容，所以預覽成本只跟視窗高度有關。
+    """
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.df = None
+        self.top = 0
+        self.items = []
+
+        self.tree = ttk.Treeview(self, show="headings")
+        self.vbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.vbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", lambda e: self.refresh())
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self.top - self.visible_rows()))
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self.top + self.visible_rows()))
+
+    # === 資料 ===
+    def set_frame(self, df, col_width=120):
+        """換上新的 DataFrame (不複製)，回到第一列"""
+        self.clear()
+        self.df = df
+        # 欄位 id 用序號，避免重複欄名衝突
+        columns = [f"c{i}" for i in range(len(df.columns))]
+        self.tree["columns"] = columns
+        for cid, name in zip(columns, df.columns):
+            self.tree.heading(cid, text=str(name))
+            self.tree.column(cid, width=col_width, anchor="center")
+        self.refresh()
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self.tree["columns"] = ()
+        self.items = []
+        self.df = None
+        self.top = 0
+        self.vbar.set(0, 1)
+
+    # === 捲動 ===
+    def row_height(self):
+        height = ttk.Style().lookup("Treeview", "rowheight")
+        try:
+            return int(height) or 20
+        except (TypeError, ValueError):
+            return 20
+
+    def visible_rows(self):
+        # 扣掉標頭一列
+        return max(1, self.tree.winfo_height() // self.row_height() - 1)
+
+    def scroll_to(self, top):
+        if self.df is None:
+            return
+        max_top = max(0, len(self.df) - self.visible_rows())
+        self.top = min(max(0, int(top)), max_top)
+        self.refresh()
+
+    def on_scrollbar(self, *args):
+        if self.df is None:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.df))
+        elif args[0] == "scroll":
+            step = self.visible_rows() if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        # Windows 每格 delta = 120
+        self.scroll_to(self.top - int(event.delta / 120) * 3)
+
+    # === 重畫可視範圍 ===
+    def refresh(self):
+        if self.df is None:
+            return
+        total = len(self.df)
+        count = min(self.visible_rows(), total)
+        self.top = min(self.top, total - count)
+
+        # 調整項目數量到剛好可視列數
+        while len(self.items) < count:
+            self.items.append(self.tree.insert("", "end"))
+        while len(self.items) > count:
+            self.tree.delete(self.items.pop())
+
+        window = self.df.iloc[self.top:self.top + count]
+        for iid, values in zip(self.items, window.itertuples(index=False, name=None)):
+            self.tree.item(iid, values=list(values))
+
+        if total:
+            self.vbar.set(self.top / total, (self.top + count) / total)
+        else:
+            self.vbar.set(0, 1)
@@ -0,0 +1,193 @@
+import os
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from pandas.io.parsers import TextParser
+
+from readerBackend import sheet_headers
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+XML_BYTES_PER_CELL = 40   # 沒有 <dimension> 時以工作表 XML 大小估算儲存格數
+XLS_BYTES_PER_CELL = 12   # .xls 以檔案大小估算
+
+
+# ===== 只讀標頭的工作表掃描 (xlsx 直接解析 zip 內 XML) =====
+def _col_index(ref):
+    """'AB12' -> 27 (0 起算)"""
+    n = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        n = n * 26 + (ord(ch.upper()) - 64)
+    return n - 1
+
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def _sheet_targets(zf):
+    """依 workbook.xml 順序回傳 [(工作表名稱, zip 內路徑)]，略過圖表工作表"""
+    rels = {}
+    with zf.open("xl/_rels/workbook.xml.rels") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == NS_PKG_REL + "Relationship" and elem.get("Type", "").endswith("/worksheet"):
+                target = elem.get("Target")
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join("xl", target))
+                rels[elem.get("Id")] = target
+
+    sheets = []
+    with zf.open("xl/workbook.xml") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == NS_MAIN + "sheet":
+                rid = elem.get(NS_REL + "id")
+                if rid in rels:
+                    sheets.append((elem.get("name"), rels[rid]))
+    return sheets
+
+
+def _head_rows(zf, target):
+    """只讀第 1、2 列 (pandas nrows=1 時也只看這兩列)
+
+    回傳 (第 1 列 {欄 index: (型別, 原始值)}, 兩列中最大欄寬)。
+    """
+    rows = {1: {}, 2: {}}
+    row_no, col_no = 0, -1
+    with zf.open(target) as f:
+        for event, elem in iterparse(f, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == NS_MAIN + "row":
+                    row_no = int(elem.get("r", row_no + 1))
+                    col_no = -1
+                    if row_no > 2:
+                        break
+            elif tag == NS_MAIN + "c":
+                ref = elem.get("r")
+                col_no = _col_index(ref) if ref else col_no + 1  # 沒有 r 屬性時接在前一格之後
+                t = elem.get("t", "n")
+                if t == "inlineStr":
+                    value = "".join(x.text or "" for x in elem.iter(NS_MAIN + "t"))
+                else:
+                    v = elem.find(NS_MAIN + "v")
+                    value = None if v is None else v.text
+                if value not in (None, "") and row_no in rows:
+                    rows[row_no][col_no] = (t, value)
+                elem.clear()
+            elif tag == NS_MAIN + "row":
+                if row_no >= 2:
+                    break
+                elem.clear()
+    width = max([max(cells) + 1 for cells in rows.values() if cells] or [0])
+    return rows[1], width
+
+
+def _shared_strings(zf, wanted):
+    """只解析到用得到的最大 index 為止"""
+    if not wanted or "xl/sharedStrings.xml" not in zf.namelist():
+        return {}
+    last = max(wanted)
+    found = {}
+    i = 0
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in iterparse(f):
+            if elem.tag == NS_MAIN + "si":
+                if i in wanted:
+                    # 略過注音 (rPh) 內的文字
+                    found[i] = "".join(
+                        t.text or ""
+                        for r in [elem] + elem.findall(NS_MAIN + "r")
+                        for t in r.findall(NS_MAIN + "t")
+                    )
+                elem.clear()
+                if i >= last:
+                    break
+                i += 1
+    return found
+
+
+def _header_names(cells, width, strings):
+    """欄名交給 pandas 的 TextParser 產生 (Unnamed: n、重複加 .1 等規則一致)"""
+    if width == 0:
+        return []
+    row = [""] * width
+    for j, (t, value) in cells.items():
+        if t == "s":
+            row[j] = strings.get(int(value), "")
+        elif t == "b":
+            row[j] = value == "1"
+        elif t in ("str", "inlineStr", "e"):
+            row[j] = value
+        else:
+            row[j] = _number(value)
+    return list(TextParser([row], header=0).read().columns)
+
+
+def scan_headers(file_path):
+    """回傳 {工作表名稱: [欄位名稱, ...]}，每張表只讀開頭兩列
+
+    .xlsx 直接解析 zip 內的 XML；.xls 或解析失敗時改用 readerBackend (calamine / openpyxl / xlrd)。
+    """
+    if str(file_path).lower().endswith(".xlsx"):
+        try:
+            with zipfile.ZipFile(file_path) as zf:
+                sheets = _sheet_targets(zf)
+                heads = {name: _head_rows(zf, target) for name, target in sheets}
+                wanted = {
+                    int(v) for cells, _ in heads.values() for t, v in cells.values() if t == "s"
+                }
+                strings = _shared_strings(zf, wanted)
+            return {
+                name: _header_names(cells, width, strings)
+                for name, (cells, width) in heads.items()
+            }
+        except (KeyError, zipfile.BadZipFile, SyntaxError, ValueError):
+            pass
+
+    return sheet_headers(file_path)
+
+
+# ===== 工作表大小 (預估記憶體用，不讀資料) =====
+def _dimension(zf, target):
+    """讀工作表開頭的 <dimension ref="A1:K1000">，回傳 (資料列數, 欄數)；沒有時回傳 None"""
+    with zf.open(target) as f:
+        for _, elem in iterparse(f, events=("start",)):
+            if elem.tag == NS_MAIN + "dimension":
+                m = re.fullmatch(r"([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?", elem.get("ref", ""))
+                if not m or not m.group(3):
+                    return None
+                rows = int(m.group(4)) - int(m.group(2))  # 扣掉標頭列
+                return max(rows, 0), _col_index(m.group(3)) - _col_index(m.group(1)) + 1
+            if elem.tag == NS_MAIN + "sheetData":
+                return None
+    return None
+
+
+def scan_dimensions(file_path):
+    """回傳 {工作表名稱: (資料列數, 欄數)}
+
+    .xlsx 讀 <dimension>，沒有時依 XML 大小估算；.xls 依檔案大小平均分配給各工作表 (粗估)。
+    """
+    if str(file_path).lower().endswith(".xlsx"):
+        with zipfile.ZipFile(file_path) as zf:
+            dims = {}
+            for name, target in _sheet_targets(zf):
+                dim = _dimension(zf, target)
+                if dim is None:
+                    _, width = _head_rows(zf, target)
+                    cells = zf.getinfo(target).file_size // XML_BYTES_PER_CELL
+                    dim = (cells // max(width, 1), width)
+                dims[name] = dim
+            return dims
+
+    headers = scan_headers(file_path)
+    cells = os.path.getsize(file_path) // XLS_BYTES_PER_CELL // max(len(headers), 1)
+    return {name: (cells // max(len(cols), 1), len(cols)) for name, cols in headers.items()}
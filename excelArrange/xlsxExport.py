@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from jobRunner import atomic_path
+
+CHUNK_ROWS = 20000
+MAX_ROWS = 1048576
+# 與 pandas.to_excel 相同的標題列 / 日期格式
+HEADER_FORMAT = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"
+
+
+# ===== 串流寫出 xlsx (xlsxwriter constant_memory，依列順序寫完就釋放) =====
+def open_workbook(path):
+    """constant_memory 模式：每寫完一列就寫進暫存檔，記憶體不隨列數增加"""
+    return xlsxwriter.Workbook(path, {"constant_memory": True})
+
+
+def is_blank(v):
+    return v is None or v is pd.NaT or isinstance(v, float) and (math.isnan(v) or math.isinf(v))
+
+
+def write_value(ws, r, c, v, fmt=None, date_fmt=None):
+    """寫入任意型別的單一值，回傳是否有寫 (空值不寫)"""
+    if is_blank(v):
+        return False
+    if isinstance(v, str):
+        ws.write_string(r, c, v, fmt)
+    elif isinstance(v, (pd.Timestamp, np.datetime64)):
+        ws.write_datetime(r, c, pd.Timestamp(v).to_pydatetime(), date_fmt or fmt)
+    elif isinstance(v, np.generic):
+        ws.write(r, c, v.item(), fmt)
+    else:
+        ws.write(r, c, v, fmt)
+    return True
+
+
+def _cell_writer(ws, kind, date_fmt):
+    """依欄位型別回傳 write(row, col, value)；空值不寫 (留空白儲存格)"""
+    if kind == "b":
+        def write(r, c, v):
+            ws.write_boolean(r, c, v)
+    elif kind in "iu":
+        def write(r, c, v):
+            ws.write_number(r, c, v)
+    elif kind == "f":
+        def write(r, c, v):
+            if not (math.isnan(v) or math.isinf(v)):
+                ws.write_number(r, c, v)
+    elif kind == "M":
+        def write(r, c, v):
+            if v is not pd.NaT:
+                ws.write_datetime(r, c, v, date_fmt)
+    else:
+        def write(r, c, v):
+            write_value(ws, r, c, v, date_fmt=date_fmt)
+    return write
+
+
+def _column_values(series):
+    """一個區塊的欄位值轉成 Python list (日期轉 datetime，時區去掉)"""
+    if series.dtype.kind == "M":
+        if getattr(series.dt, "tz", None) is not None:
+            series = series.dt.tz_localize(None)
+        return list(series.dt.to_pydatetime())
+    return series.tolist()
+
+
+def write_sheet(workbook, sheet_name, df, rows=None, extra=None, chunk_rows=CHUNK_ROWS, progress=None):
+    """df 依列順序分塊寫成一張工作表，回傳 (worksheet, 資料筆數)
+
+    rows: 布林陣列，只寫出 True 的列 (取代先複製一份篩選後的 DataFrame)
+    extra: {欄名: Series}，視同 df[欄名] = Series 一起寫出 (不必先 df.copy() 再加欄)
+    progress(done, total, text)：每寫完一個區塊呼叫一次。
+    """
+    names = list(df.columns)
+    columns = [df.iloc[:, i] for i in range(df.shape[1])]
+    for name, series in (extra or {}).items():
+        # 與 df[name] = series 相同：同名欄位原地取代，否則加在最後
+        if name in names:
+            columns[names.index(name)] = series
+        else:
+            names.append(name)
+            columns.append(series)
+    names = [str(c) for c in names]
+    keep = np.ones(len(df), dtype=bool) if rows is None else np.asarray(rows, dtype=bool)
+    total = int(keep.sum())
+    if total + 1 > MAX_ROWS:
+        raise ValueError(f"資料有 {total} 筆，超過 Excel 單一工作表上限 {MAX_ROWS - 1} 筆")
+
+    ws = workbook.add_worksheet(sheet_name)
+    ws.write_row(0, 0, names, workbook.add_format(HEADER_FORMAT))
+    date_fmt = workbook.add_format({"num_format": DATETIME_FORMAT})
+    writers = [_cell_writer(ws, s.dtype.kind, date_fmt) for s in columns]
+
+    r = 1
+    for start in range(0, len(df), chunk_rows):
+        part = keep[start:start + chunk_rows]
+        if not part.any():
+            continue
+        values = [_column_values(s.iloc[start:start + chunk_rows][part]) for s in columns]
+        for row in zip(*values):
+            for c, v in enumerate(row):
+                writers[c](r, c, v)
+            r += 1
+        if progress:
+            progress(r - 1, total, f"{sheet_name}：已寫出 {r - 1}/{total} 筆")
+    return ws, r - 1
+
+
+class SheetAppender:
+    """分多次把 DataFrame 區塊依序附加到同一張工作表 (欄位固定，管線逐塊寫出時使用)"""
+
+    def __init__(self, workbook, sheet_name, columns):
+        self.ws = workbook.add_worksheet(sheet_name)
+        self.ws.write_row(0, 0, [str(c) for c in columns], workbook.add_format(HEADER_FORMAT))
+        self.date_fmt = workbook.add_format({"num_format": DATETIME_FORMAT})
+        self.rows = 0
+
+    def append(self, df):
+        if self.rows + len(df) + 1 > MAX_ROWS:
+            raise ValueError(f"超過 Excel 單一工作表上限 {MAX_ROWS - 1} 筆")
+        columns = [df.iloc[:, i] for i in range(df.shape[1])]
+        writers = [_cell_writer(self.ws, s.dtype.kind, self.date_fmt) for s in columns]
+        r = self.rows + 1
+        for row in zip(*(_column_values(s) for s in columns)):
+            for c, v in enumerate(row):
+                writers[c](r, c, v)
+            r += 1
+        self.rows = r - 1
+
+
+def export_frame(path, df, sheet_name="Sheet1", progress=None):
+    """單一 DataFrame 寫成 xlsx (不含 index)，失敗時不留下半個檔案"""
+    with atomic_path(path) as tmp_path:
+        with open_workbook(tmp_path) as workbook:
+            write_sheet(workbook, sheet_name, df, progress=progress)